@@ -0,0 +1,91 @@
+"""Text category columns vs lookup tables: database size, report query time, DataFrame memory
+
+Usage: python benchmarks/bench_categories.py [--vehicles N] [--repeat R]
+
+The "text" database stops at the migration before _normalize_categories,
+so it has the layout vehicles had until then; the "lookup" one is the
+current schema. Sizes come from the dbstat virtual table.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_search import synthetic_rows
+import db
+
+def init_text_schema(conn):
+    # Every migration up to, but not including, the lookup tables
+    migrations = db.MIGRATIONS
+    db.MIGRATIONS = migrations[:migrations.index(db._normalize_categories)]
+    try:
+        db.init_schema(conn)
+    finally:
+        db.MIGRATIONS = migrations
+
+def sizes(conn):
+    """KB used by tables, their indexes and the search index"""
+    kinds = dict(conn.execute("SELECT name, type FROM sqlite_master"))
+    used = {'tables': 0, 'indexes': 0, 'search': 0}
+    for name, size in conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"):
+        if name.startswith('vehicles_fts'):
+            used['search'] += size
+        elif kinds.get(name) == 'index' or name.startswith('sqlite_autoindex'):
+            used['indexes'] += size
+        else:
+            used['tables'] += size
+    return {kind: size / 1024 for kind, size in used.items()}
+
+def report_ms(conn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(db.VEHICLE_TYPE_REPORT_SQL, ("Loader Rickshaw",)).fetchall()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def frame_mb(conn, categorical):
+    import pandas as pd
+    df = pd.read_sql_query("SELECT * FROM vehicles", conn)
+    if categorical:
+        df = df.astype({col: 'category' for col in db.CATEGORICAL_COLUMNS})
+    return df.memory_usage(deep=True).sum() / 2**20
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vehicles', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = list(synthetic_rows(args.vehicles))
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for layout in ('text', 'lookup'):
+            pool = db.ConnectionPool(os.path.join(tmp, f"{layout}.db"), size=1)
+            with pool.connection() as conn:
+                if layout == 'text':
+                    init_text_schema(conn)
+                    conn.executemany(db.INSERT_VEHICLE_SQL, rows)
+                else:
+                    db.init_schema(conn)
+                    db.insert_vehicles(conn, rows)
+                conn.commit()
+                conn.execute("VACUUM")
+                results[layout] = dict(sizes(conn), report=report_ms(conn, args.repeat),
+                                       frame=frame_mb(conn, categorical=False),
+                                       categorical=frame_mb(conn, categorical=True))
+            pool.close()
+
+    print(f"vehicles={args.vehicles}")
+    print(f"{'layout':<8} {'tables KB':>10} {'indexes KB':>11} {'search KB':>10} {'report ms':>10} "
+          f"{'frame MB':>9} {'categorical MB':>15}")
+    for layout, r in results.items():
+        print(f"{layout:<8} {r['tables']:>10.0f} {r['indexes']:>11.0f} {r['search']:>10.0f} {r['report']:>10.2f} "
+              f"{r['frame']:>9.1f} {r['categorical']:>15.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Concurrent edits: blind INSERT OR REPLACE vs versioned updates with retry
+
+Usage: python benchmarks/bench_concurrent_writes.py [--vehicles K] [--threads T]
+                                                    [--edits N] [--generate-batch G]
+
+T threads each make N read-modify-write edits (YEAR + 1) to a random one
+of K vehicles, the way dispatchers edit through the vehicle form, while
+another thread keeps generating vehicles in batches of G, holding the
+write lock like a generation job does.
+
+"legacy" is the form as it was: a fresh sqlite3 connection per helper and
+an unchecked INSERT OR REPLACE. "versioned" goes through the pool with
+db.update_vehicle and ConnectionPool.write, re-reading and retrying an
+edit that hits a ConcurrentEditError. Every successful edit adds one to
+the YEAR total, so any shortfall is a lost update.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fleet import synthetic_fleet
+import db
+import generator
+
+SELECT_SQL = f"SELECT {', '.join(db.VEHICLE_COLUMNS)} FROM vehicles WHERE VEH_ID = ?"
+
+def seed(pool, count):
+    rows = [row[:5] + (0,) + row[6:] for row in synthetic_fleet(count)]
+    pool.write(db.insert_vehicles, rows)
+    return [row[0] for row in rows]
+
+def year_total(pool, veh_ids):
+    with pool.connection() as conn:
+        return conn.execute("SELECT SUM(YEAR) FROM vehicle_records WHERE VEH_ID IN (SELECT value FROM json_each(?))",
+                            (json.dumps(veh_ids),)).fetchone()[0]
+
+def legacy_edit(path, veh_id):
+    # Read, then write the whole row back over whatever is there now
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA recursive_triggers = ON")
+    try:
+        row = conn.execute(SELECT_SQL, (veh_id,)).fetchone()
+        conn.execute(f"INSERT OR REPLACE INTO vehicles ({', '.join(db.VEHICLE_COLUMNS)}) "
+                     f"VALUES ({', '.join('?' * len(db.VEHICLE_COLUMNS))})", row[:5] + (row[5] + 1,) + row[6:])
+        conn.commit()
+    finally:
+        conn.close()
+    return 0
+
+def versioned_edit(pool, veh_id):
+    # Returns the number of conflicts it had to retry
+    conflicts = 0
+    while True:
+        with pool.connection() as conn:
+            vehicle, version = db.read_vehicle(conn, veh_id)
+        values = tuple(vehicle[col] for col in db.VEHICLE_COLUMNS)
+        try:
+            pool.write(db.update_vehicle, values[:5] + (values[5] + 1,) + values[6:], version)
+            return conflicts
+        except db.ConcurrentEditError:
+            conflicts += 1
+
+def run(mode, path, veh_ids, threads, edits, generate_batch):
+    pool = db.ConnectionPool(path, size=threads + 2)
+    edit = (lambda veh_id: legacy_edit(path, veh_id)) if mode == "legacy" else \
+           (lambda veh_id: versioned_edit(pool, veh_id))
+    tally = {'done': 0, 'conflicts': 0, 'errors': 0, 'generated': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def editor(seed):
+        rng = random.Random(seed)
+        for _ in range(edits):
+            try:
+                conflicts = edit(rng.choice(veh_ids))
+            except sqlite3.OperationalError:
+                with lock:
+                    tally['errors'] += 1
+                continue
+            with lock:
+                tally['done'] += 1
+                tally['conflicts'] += conflicts
+
+    def bulk_writer():
+        while not stop.is_set():
+            tally['generated'] += pool.write(generator.generate_vehicles, {"Loader Rickshaw": generate_batch})
+
+    workers = [threading.Thread(target=editor, args=(i,)) for i in range(threads)]
+    background = threading.Thread(target=bulk_writer) if generate_batch else None
+    before = year_total(pool, veh_ids)
+    start = time.perf_counter()
+    if background:
+        background.start()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    if background:
+        background.join()
+    after = year_total(pool, veh_ids)
+    with pool.connection() as conn:
+        stats_ok = not db.check_stats(conn)
+    pool.close()
+    return dict(tally, elapsed=elapsed, lost=tally['done'] - (after - before), stats_ok=stats_ok)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vehicles', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--edits', type=int, default=200)
+    parser.add_argument('--generate-batch', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"vehicles={args.vehicles} threads={args.threads} edits/thread={args.edits} "
+          f"generate batch={args.generate_batch}")
+    print(f"{'mode':<10} {'edits/s':>8} {'saved':>6} {'conflicts':>10} {'lock errors':>12} "
+          f"{'lost updates':>13} {'generated':>10}  counters")
+    for mode in ("legacy", "versioned"):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'vehicles.db')
+            pool = db.ConnectionPool(path, size=1)
+            with pool.connection() as conn:
+                db.init_schema(conn)
+            veh_ids = seed(pool, args.vehicles)
+            pool.close()
+            r = run(mode, path, veh_ids, args.threads, args.edits, args.generate_batch)
+        print(f"{mode:<10} {r['done'] / r['elapsed']:>8.0f} {r['done']:>6} {r['conflicts']:>10} {r['errors']:>12} "
+              f"{r['lost']:>13} {r['generated']:>10}  {'ok' if r['stats_ok'] else 'OUT OF DATE'}")
+
+if __name__ == '__main__':
+    main()
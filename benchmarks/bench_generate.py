@@ -0,0 +1,73 @@
+"""Vehicle generation: count-the-rows VEH_ID lookup vs the sequence table
+
+Usage: python benchmarks/bench_generate.py [--vehicles N] [--legacy-vehicles N]
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def legacy_generate(conn, prefixes, usage_rules, vehicle_counts):
+    # The generator as it was: two SELECT * scans of the type per vehicle
+    c = conn.cursor()
+    for vehicle_type, count in vehicle_counts.items():
+        for _ in range(count):
+            n = len(c.execute('SELECT * FROM vehicles WHERE VEHICLE_TYPE = ?', (vehicle_type,)).fetchall()) + 1
+            reg = len(c.execute('SELECT * FROM vehicles WHERE VEHICLE_TYPE = ?', (vehicle_type,)).fetchall()) + 1
+            c.execute(
+                'INSERT INTO vehicles (VEH_ID, REG_NO, VEHICLE_TYPE, MAKE, MODEL, YEAR, OWNER, USED_FOR) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (f"{prefixes[vehicle_type]}{n}", f"{vehicle_type} REG {reg}", vehicle_type,
+                 "Default Make", "Default Model", 2020, "Default Owner", usage_rules[vehicle_type])
+            )
+    conn.commit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vehicles', type=int, default=100_000)
+    parser.add_argument('--legacy-vehicles', type=int, default=1_000)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)  # bare-mode Streamlit warnings
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        import resources
+        from page_generate import generate_vehicles
+        import db
+        from constants import VEH_ID_PREFIXES, USAGE_RULES
+        resources.init_db()
+
+        legacy_path = os.path.join(tmp, 'legacy.db')
+        conn = sqlite3.connect(legacy_path)
+        db.init_schema(conn)
+        start = time.perf_counter()
+        legacy_generate(conn, VEH_ID_PREFIXES, USAGE_RULES,
+                        {"Loader Rickshaw": args.legacy_vehicles})
+        legacy = time.perf_counter() - start
+        conn.close()
+
+        start = time.perf_counter()
+        generate_vehicles({"Loader Rickshaw": args.vehicles})
+        sequenced = time.perf_counter() - start
+
+        # Both Dumper types draw from the shared "D" counter
+        generate_vehicles({"Dumper (20m3)": 5, "Dumper (5m3)": 5})
+        with resources.get_pool().connection() as conn:
+            dumpers = conn.execute("SELECT COUNT(DISTINCT VEH_ID) FROM vehicles WHERE VEH_ID GLOB 'D-*'").fetchone()[0]
+        assert dumpers == 10, dumpers
+        resources.get_pool().close()
+        os.chdir(ROOT)
+
+    print(f"legacy:    {args.legacy_vehicles:>8} vehicles in {legacy:8.2f}s "
+          f"({args.legacy_vehicles / legacy:10.0f}/s)")
+    print(f"sequenced: {args.vehicles:>8} vehicles in {sequenced:8.2f}s "
+          f"({args.vehicles / sequenced:10.0f}/s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Cold import cost of each Streamlit page module, from python -X importtime
+
+Usage: python benchmarks/bench_importtime.py [--repeat R] [--max-ms MS]
+
+Each page is imported in a fresh interpreter with Streamlit already loaded,
+so the figure is what the page itself adds to the first request after a
+restart. Exits 1 if a page pulls in pandas or ReportLab at import time or
+takes longer than --max-ms.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = ["resources", "page_home", "page_import", "page_vehicle_form", "page_generate", "page_reports", "page_jobs"]
+
+# Loaded on first use by the code paths that need them, never by importing a page
+HEAVY_MODULES = ("pandas", "reportlab")
+
+# What app.py used to import up front on every page
+LEGACY_IMPORTS = "import pandas, reportlab.platypus, reportlab.pdfgen.canvas"
+
+def import_cost(statement):
+    """Milliseconds spent on statement's imports, and the heavy modules they loaded"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import streamlit; {statement}"],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    cost, heavy = 0, set()
+    seen_streamlit = False
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if name.strip() == 'streamlit' and not name[1:].startswith(' '):
+            seen_streamlit = True
+            continue
+        if not seen_streamlit:
+            continue
+        # Top-level entries are the ones not nested under another import
+        if not name[1:].startswith(' '):
+            cost += int(cumulative) / 1000
+        root = name.strip().split('.')[0]
+        if root in HEAVY_MODULES:
+            heavy.add(root)
+    return cost, heavy
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=150.0)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'module':<20} {'median ms':>10}  heavy modules")
+    for module in PAGES:
+        samples, heavy = [], set()
+        for _ in range(args.repeat):
+            cost, loaded = import_cost(f"import {module}")
+            samples.append(cost)
+            heavy |= loaded
+        median = statistics.median(samples)
+        print(f"{module:<20} {median:>10.1f}  {', '.join(sorted(heavy)) or '-'}")
+        if heavy:
+            failures.append(f"{module} imports {', '.join(sorted(heavy))}")
+        if median > args.max_ms:
+            failures.append(f"{module} took {median:.1f} ms (limit {args.max_ms:.0f} ms)")
+
+    legacy = statistics.median(import_cost(LEGACY_IMPORTS)[0] for _ in range(args.repeat))
+    print(f"{'(old eager imports)':<20} {legacy:>10.1f}  pandas, reportlab")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Report table preparation for a large fleet: per-column widths and per-row
+BACKGROUND styles vs one string conversion and ROWBACKGROUNDS
+
+Usage: python benchmarks/bench_report_layout.py [--rows N] [--full]
+
+--full also lays out the whole table into a PDF with each style list.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter, landscape
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+from benchmarks.bench_search import synthetic_rows
+import db
+import pdf_reports_final
+
+def legacy_layout(df):
+    max_lengths = {}
+    for col in df.columns:
+        if col == 'SR.':
+            max_lengths[col] = 3
+        else:
+            max_lengths[col] = max(len(str(col)), df[col].astype(str).str.len().max() if len(df) > 0 else 0)
+    table_data = [df.columns.tolist()] + df.values.tolist()
+    styles = [('BACKGROUND', (0, i), (-1, i), colors.lightgrey if i % 2 == 0 else colors.white)
+              for i in range(1, len(table_data))]
+    return max_lengths, styles
+
+def vectorized_layout(df):
+    max_lengths = pdf_reports_final.column_content_lengths(df)
+    table_data = [df.columns.tolist()] + df.values.tolist()
+    styles = [('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])]
+    return max_lengths, styles
+
+def build_pdf(df, layout):
+    _, styles = layout(df)
+    table = Table([df.columns.tolist()] + df.values.tolist(), repeatRows=1)
+    table.setStyle(TableStyle([('FONTSIZE', (0, 0), (-1, -1), 9)] + styles))
+    SimpleDocTemplate(io.BytesIO(), pagesize=landscape(letter)).build([table])
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000)
+    parser.add_argument('--full', action='store_true')
+    args = parser.parse_args()
+
+    df = pd.DataFrame(list(synthetic_rows(args.rows)), columns=db.VEHICLE_COLUMNS)
+    df.insert(0, 'SR.', range(1, len(df) + 1))
+
+    assert legacy_layout(df)[0] == vectorized_layout(df)[0]
+    before = timed(legacy_layout, df)
+    after = timed(vectorized_layout, df)
+    print(f"rows={args.rows}")
+    print(f"per-column + per-row styles: {before * 1000:9.1f} ms")
+    print(f"single pass + ROWBACKGROUNDS:{after * 1000:9.1f} ms  ({before / after:.1f}x)")
+
+    if args.full:
+        before = timed(build_pdf, df, legacy_layout)
+        after = timed(build_pdf, df, vectorized_layout)
+        print(f"full PDF, per-row styles:    {before:9.1f} s")
+        print(f"full PDF, ROWBACKGROUNDS:    {after:9.1f} s  ({before / after:.1f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Peak Python memory of the streaming report engine as the page count grows
+
+Usage: python benchmarks/bench_report_memory.py [--pages 10,100,1000]
+
+Rows are streamed from a SQLite cursor and only one page's table exists at
+a time; what still grows is ReportLab's buffer of finished page streams,
+a few tens of KB per page, which it keeps until the file is saved.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_search import synthetic_rows
+import db
+import pdf_reports_final
+
+ROWS_PER_PAGE = 33
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', default='10,100,1000')
+    args = parser.parse_args()
+    sizes = [int(p) for p in args.pages.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = db.ConnectionPool(os.path.join(tmp, 'vehicles.db'))
+        with pool.connection() as conn:
+            db.init_schema(conn)
+            db.insert_vehicles(conn, list(synthetic_rows(max(sizes) * ROWS_PER_PAGE)))
+            conn.commit()
+
+            print(f"{'pages':>6} {'rows':>8} {'peak MB':>9} {'seconds':>8}")
+            for pages in sizes:
+                query = "SELECT * FROM vehicles ORDER BY p_key LIMIT ?"
+                tracemalloc.start()
+                start = time.perf_counter()
+                pdf_reports_final.generate_vehicle_report_from_query(
+                    conn, query, (pages * ROWS_PER_PAGE,), "Fleet", "bench"
+                )
+                elapsed = time.perf_counter() - start
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                print(f"{pages:>6} {pages * ROWS_PER_PAGE:>8} {peak / 2**20:>9.1f} {elapsed:>8.1f}")
+        pool.close()
+
+if __name__ == '__main__':
+    main()
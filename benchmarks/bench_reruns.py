@@ -0,0 +1,85 @@
+"""Home page reruns per second: per-call sqlite3.connect vs the shared pool
+
+Usage: python benchmarks/bench_reruns.py [--rows N] [--threads T] [--seconds S]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+
+def seed(path, rows):
+    conn = sqlite3.connect(path)
+    db.init_schema(conn)
+    conn.executemany(
+        'INSERT INTO vehicles (VEH_ID, REG_NO, VEHICLE_TYPE, MAKE, MODEL, YEAR, OWNER, USED_FOR) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        ((f"LR-{i:05d}", f"AAW-20-{i:04d}", "Loader Rickshaw", "RP110", "US100", 2020, "UC-74",
+          "Door to Door (Residential)") for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+def rerun(conn):
+    # What one Home page rerun asks of the database
+    db.init_schema(conn)
+    conn.execute('SELECT COUNT(*) FROM vehicles').fetchone()
+    conn.execute('SELECT * FROM vehicles').fetchall()
+
+def rerun_connect(path):
+    # One open/close cycle per helper, as app.py used to do
+    for _ in range(2):
+        conn = sqlite3.connect(path)
+        rerun(conn)
+        conn.close()
+
+def rerun_pooled(pool):
+    with pool.connection() as conn:
+        rerun(conn)
+    with pool.connection() as conn:
+        rerun(conn)
+
+def measure(fn, threads, seconds):
+    done = [0] * threads
+    stop = time.perf_counter() + seconds
+
+    def worker(i):
+        while time.perf_counter() < stop:
+            fn()
+            done[i] += 1
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(done) / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=150)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'vehicles.db')
+        seed(path, args.rows)
+
+        before = measure(lambda: rerun_connect(path), args.threads, args.seconds)
+        pool = db.ConnectionPool(path)
+        after = measure(lambda: rerun_pooled(pool), args.threads, args.seconds)
+        pool.close()
+
+    print(f"rows={args.rows} threads={args.threads}")
+    print(f"per-call connect: {before:10.1f} reruns/s")
+    print(f"pooled:           {after:10.1f} reruns/s  ({after / before:.2f}x)")
+
+if __name__ == '__main__':
+    main()
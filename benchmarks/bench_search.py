@@ -0,0 +1,61 @@
+"""All Vehicles search latency: seven ORed LIKE scans vs the FTS5 trigram index
+
+Usage: python benchmarks/bench_search.py [--sizes 1000,100000,1000000] [--repeat R]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+
+TYPES = ["Loader Rickshaw", "Mini Tipper", "Compactor", "Tractor Trolley", "Mechanical Sweeper"]
+TERMS = ["AAW-20", "Rickshaw", "UC-74", "9370"]
+
+def synthetic_rows(count, seed=7):
+    rng = random.Random(seed)
+    for i in range(count):
+        letters = ''.join(rng.choice('ABCDEFGHJKLMNPRSTUVWXYZ') for _ in range(3))
+        yield (f"V-{i:07d}", f"{letters}-{rng.randint(18, 23)}-{rng.randint(1000, 9999)}",
+               rng.choice(TYPES), f"U{rng.randint(100000, 999999)}", f"US{rng.randint(10**8, 10**9)}",
+               rng.randint(2005, 2023), f"UC-{rng.randint(1, 120)}", "Door to Door (Residential)")
+
+def like_query(term):
+    where = ' OR '.join(f'{col} LIKE ?' for col in db.SEARCH_COLUMNS)
+    return f"SELECT * FROM vehicles WHERE {where}", (f"%{term}%",) * len(db.SEARCH_COLUMNS)
+
+def timed(conn, query, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,100000,1000000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'term':>10} {'LIKE ms':>10} {'FTS5 ms':>10}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as tmp:
+            pool = db.ConnectionPool(os.path.join(tmp, 'vehicles.db'))
+            with pool.connection() as conn:
+                db.init_schema(conn)
+                db.insert_vehicles(conn, list(synthetic_rows(size)))
+                conn.commit()
+                for term in TERMS:
+                    like_ms = timed(conn, *like_query(term), args.repeat)
+                    fts_ms = timed(conn, *db.search_query(term), args.repeat)
+                    print(f"{size:>9} {term:>10} {like_ms:>10.2f} {fts_ms:>10.2f}")
+            pool.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Fleet round trip between two databases: CSV vs the Parquet snapshot
+
+Usage: python benchmarks/bench_snapshot.py [--vehicles N]
+
+Both formats are exported from the same database and imported into an
+empty one through importer.import_file, so the import side includes the
+same validation and chunked writes.
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_search import synthetic_rows
+import db
+import importer
+import snapshot
+
+def export_csv(conn, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(db.VEHICLE_COLUMNS)
+        writer.writerows(conn.execute(f"SELECT {', '.join(db.VEHICLE_COLUMNS)} FROM vehicles ORDER BY p_key"))
+
+def round_trip(source_conn, tmp, name, export):
+    path = os.path.join(tmp, name)
+    start = time.perf_counter()
+    export(source_conn, path)
+    exported = time.perf_counter() - start
+
+    # Parsing alone, without the database writes
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        for _ in importer.read_chunks(f, name):
+            pass
+    parsed = time.perf_counter() - start
+
+    pool = db.ConnectionPool(os.path.join(tmp, f"{name}.db"))
+    with pool.connection() as conn:
+        db.init_schema(conn)
+        start = time.perf_counter()
+        with open(path, 'rb') as f:
+            counts = importer.import_file(conn, f, name)
+        imported = time.perf_counter() - start
+        year_types = [row[0] for row in conn.execute("SELECT DISTINCT typeof(YEAR) FROM vehicles")]
+    pool.close()
+    assert counts['inserted'] == counts['read'], counts
+    return os.path.getsize(path), exported, parsed, imported, year_types
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--vehicles', type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = db.ConnectionPool(os.path.join(tmp, 'source.db'))
+        with pool.connection() as conn:
+            db.init_schema(conn)
+            rows = list(synthetic_rows(args.vehicles))
+            # Blank some years, as in real uploads
+            rows = [row[:5] + (None,) + row[6:] if i % 10 == 0 else row for i, row in enumerate(rows)]
+            db.insert_vehicles(conn, rows)
+            conn.commit()
+
+            print(f"vehicles={args.vehicles}")
+            print(f"{'format':<8} {'size KB':>9} {'export s':>9} {'parse s':>9} {'import s':>9}  YEAR types")
+            for name, export in (("fleet.csv", export_csv), ("fleet.parquet", snapshot.export_snapshot)):
+                size, exported, parsed, imported, year_types = round_trip(conn, tmp, name, export)
+                print(f"{name.split('.')[1]:<8} {size / 1024:>9.0f} {exported:>9.2f} {parsed:>9.2f} {imported:>9.2f}  "
+                      f"{', '.join(sorted(year_types))}")
+        pool.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""Sustained small writes: one transaction per call vs the batching writer
+
+Usage: python benchmarks/bench_write_batching.py [--threads 1,8,32] [--seconds S] [--vehicles K]
+
+Every thread plays a session saving edits back to back: it changes the
+MODEL of a random vehicle, bumps the data version and waits for the
+commit before the next edit. "direct" commits each edit with
+ConnectionPool.write; "batched" hands it to writer.BatchWriter and waits
+on the Future. Both are run with synchronous=NORMAL (the app's setting)
+and FULL, where every commit also waits for an fsync.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fleet import synthetic_fleet
+import db
+import perf
+import writer
+
+def edit(conn, veh_id, model):
+    db.update_vehicles(conn, 'MODEL', model, veh_ids=[veh_id])
+    db.bump_data_version(conn)
+
+def measure(save, veh_ids, threads, seconds):
+    done = [0] * threads
+    stop = time.perf_counter() + seconds
+
+    def session(i):
+        rng = random.Random(i)
+        while time.perf_counter() < stop:
+            save(rng.choice(veh_ids), f"M{rng.randrange(10**6)}")
+            done[i] += 1
+
+    workers = [threading.Thread(target=session, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sum(done) / seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', default='1,8,32')
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--vehicles', type=int, default=10_000)
+    args = parser.parse_args()
+    thread_counts = [int(t) for t in args.threads.split(',')]
+
+    print(f"vehicles={args.vehicles} seconds={args.seconds}")
+    print(f"{'synchronous':<12} {'threads':>7} {'direct/s':>9} {'batched/s':>10} {'speedup':>8} {'mean batch':>11}")
+    for synchronous in ("NORMAL", "FULL"):
+        db.PRAGMAS['synchronous'] = synchronous
+        with tempfile.TemporaryDirectory() as tmp:
+            pool = db.ConnectionPool(os.path.join(tmp, 'vehicles.db'), size=max(thread_counts) + 2)
+            with pool.connection() as conn:
+                db.init_schema(conn)
+            rows = list(synthetic_fleet(args.vehicles))
+            pool.write(db.insert_vehicles, rows)
+            veh_ids = [row[0] for row in rows]
+
+            batch_writer = writer.BatchWriter(pool)
+            for threads in thread_counts:
+                direct = measure(lambda veh_id, model: pool.write(edit, veh_id, model),
+                                 veh_ids, threads, args.seconds)
+                perf.RECORDER.reset()
+                batched = measure(lambda veh_id, model: batch_writer.write(edit, veh_id, model),
+                                  veh_ids, threads, args.seconds)
+                batch_size = next(s['rows'] for s in perf.RECORDER.summary() if s['name'] == "writer: batch")
+                print(f"{synchronous:<12} {threads:>7} {direct:>9.0f} {batched:>10.0f} {batched / direct:>7.1f}x "
+                      f"{batch_size:>11.1f}")
+            batch_writer.shutdown()
+            with pool.connection() as conn:
+                assert not db.check_stats(conn)
+            pool.close()
+
+if __name__ == '__main__':
+    main()
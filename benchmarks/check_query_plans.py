@@ -0,0 +1,34 @@
+"""Fail if any hot query in db.INDEXED_QUERIES falls back to a full table scan
+
+Usage: python benchmarks/check_query_plans.py [path/to/vehicles.db]
+
+Without a path the check runs against a fresh schema in a temporary file.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db
+
+def check(path):
+    pool = db.ConnectionPool(path)
+    with pool.connection() as conn:
+        db.init_schema(conn)
+        scans = db.query_plan_scans(conn)
+    pool.close()
+    for name in db.INDEXED_QUERIES:
+        print(f"FAIL {name}: {scans[name]}" if name in scans else f"ok   {name}")
+    return not scans
+
+def main():
+    if len(sys.argv) > 1:
+        ok = check(sys.argv[1])
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            ok = check(os.path.join(tmp, 'vehicles.db'))
+    sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
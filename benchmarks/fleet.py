@@ -0,0 +1,86 @@
+"""Synthetic fleets shaped like the real one
+
+The vehicle type mix, owners and the shapes of REG_NO, MAKE and MODEL
+values are taken from tnd_latest_data.csv: a shape keeps the layout of a
+sample value (AAW-20-9370 becomes AAA-99-9999) and is filled with random
+letters and digits of the same kind. Every type gets at least a small
+share, so rare types still have rows and reports. VEH_IDs follow the
+prefixes and widths in constants, and USED_FOR follows USAGE_RULES.
+
+The sample has no YEAR values, so a third of the vehicles get a year to
+keep the integer column exercised. The same size and seed always give the
+same rows.
+"""
+import csv
+import os
+import random
+from collections import Counter
+
+from constants import VEHICLE_TYPES, VEH_ID_PREFIXES, USAGE_RULES, format_veh_id
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tnd_latest_data.csv')
+
+# Extra weight per vehicle type, so types missing from the sample still appear
+TYPE_WEIGHT_FLOOR = 1
+
+YEAR_SHARE = 1 / 3
+YEARS = range(2005, 2025)
+
+LETTERS = 'ABCDEFGHJKLMNPRSTUVWXYZ'
+DIGITS = '0123456789'
+
+def shape(value):
+    """Layout of a value: letters become A, digits 9, the rest is kept"""
+    return ''.join('A' if ch.isalpha() else '9' if ch.isdigit() else ch for ch in value.upper())
+
+def fill(pattern, rng):
+    return ''.join(rng.choice(LETTERS) if ch == 'A' else rng.choice(DIGITS) if ch == '9' else ch
+                   for ch in pattern)
+
+def _weighted(counter):
+    values = list(counter)
+    return values, [counter[value] for value in values]
+
+class FleetProfile:
+    """Value distributions read from a sample CSV export"""
+    def __init__(self, path=SAMPLE_CSV):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            records = list(csv.DictReader(f))
+        types = Counter(r['VEHICLE_TYPE'] for r in records if r['VEHICLE_TYPE'] in VEH_ID_PREFIXES)
+        for vehicle_type in VEHICLE_TYPES:
+            types[vehicle_type] += TYPE_WEIGHT_FLOOR
+        self.types = _weighted(types)
+        # Blank owners are stored as NULL, as the importer does
+        self.owners = _weighted(Counter(r['OWNER'].strip() or None for r in records))
+        self.shapes = {col: _weighted(Counter(shape(r[col].strip()) for r in records if r[col].strip()))
+                       for col in ('REG_NO', 'MAKE', 'MODEL')}
+
+def synthetic_fleet(count, seed=7, profile=None):
+    """
+    Yield count vehicle rows in db.VEHICLE_COLUMNS order
+
+    Parameters:
+    - count: number of vehicles
+    - seed: random seed; the same seed gives the same fleet
+    - profile: FleetProfile to draw from, the bundled sample by default
+    """
+    profile = profile or FleetProfile()
+    rng = random.Random(seed)
+    next_number = Counter()
+    types, type_weights = profile.types
+    owners, owner_weights = profile.owners
+    batch = 10_000
+    for start in range(0, count, batch):
+        size = min(batch, count - start)
+        # Drawing whole batches keeps generation of a million rows to seconds
+        picked_types = rng.choices(types, type_weights, k=size)
+        picked_owners = rng.choices(owners, owner_weights, k=size)
+        patterns = {col: rng.choices(*profile.shapes[col], k=size) for col in profile.shapes}
+        for i in range(size):
+            vehicle_type = picked_types[i]
+            prefix = VEH_ID_PREFIXES[vehicle_type]
+            next_number[prefix] += 1
+            year = rng.choice(YEARS) if rng.random() < YEAR_SHARE else None
+            yield (format_veh_id(prefix, next_number[prefix]), fill(patterns['REG_NO'][i], rng), vehicle_type,
+                   fill(patterns['MAKE'][i], rng), fill(patterns['MODEL'][i], rng), year,
+                   picked_owners[i], USAGE_RULES[vehicle_type] or None)
@@ -0,0 +1,243 @@
+"""Benchmark suite: hot operations on synthetic fleets, compared with a stored baseline
+
+Usage: python benchmarks/suite.py [--sizes 1000,100000,1000000] [--repeat R]
+                                  [--output FILE] [--baseline FILE] [--save-baseline]
+                                  [--tolerance 0.25]
+
+Each size gets a fresh database filled from benchmarks/fleet.py, then the
+operations below run against it headlessly, through the same functions
+the pages and jobs call. Cheap operations are repeated and their median
+kept; bulk ones (import, generation, reports) are only repeated on fleets
+of up to REPEAT_BULK_UP_TO vehicles, and seeding always runs once.
+
+Results are written as JSON to --output. When the baseline file exists,
+every operation is compared with it and the run exits with status 1 if
+any is more than --tolerance slower (and at least MIN_REGRESSION_MS
+slower, so sub-millisecond noise is ignored). --save-baseline replaces
+the baseline with this run. Baselines are only comparable on the same
+machine; the million-row size takes several minutes.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fleet import synthetic_fleet
+import db
+import generator
+import importer
+import pdf_reports_final
+
+DEFAULT_SIZES = '1000,100000,1000000'
+DEFAULT_OUTPUT = os.path.join(ROOT, 'benchmarks', 'results.json')
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_MS = 5.0
+
+# Search terms: a REG_NO fragment, a type word and an owner, plus one too
+# short for the trigram index
+SEARCH_TERMS = ["-20-", "Rickshaw", "TANDLIANWALA", "UC"]
+PAGE_SIZE = 50
+
+REPORT_TYPE = "Tractor Trolley"
+REPORT_USAGE = "Bulk Waste Collection"
+
+# Vehicles added by the generation step, capped by the fleet size
+GENERATE_VEHICLES = 5000
+
+# Larger fleets run the bulk operations once; a single run on a small
+# fleet is too short to be steady
+REPEAT_BULK_UP_TO = 10_000
+
+def measure(fn, repeat):
+    """Median and minimum milliseconds of repeat calls; returns (stats, last result)"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {'ms': statistics.median(samples), 'min_ms': min(samples), 'runs': repeat}, result
+
+def seed(pool, rows):
+    with pool.connection() as conn:
+        db.init_schema(conn)
+        db.insert_vehicles(conn, rows)
+        conn.commit()
+
+def search(conn):
+    for term in SEARCH_TERMS:
+        conn.execute(*db.search_query(term, limit=PAGE_SIZE)).fetchall()
+
+def count_matches(conn):
+    return sum(conn.execute(*db.count_query(term)).fetchone()[0] for term in SEARCH_TERMS)
+
+def dashboard_counts(conn):
+    # What the Home page reads on every rerun
+    db.total_vehicles(conn)
+    for dimension in db.STATS_DIMENSIONS:
+        db.vehicle_stats(conn, dimension)
+
+def export_csv(conn, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(db.VEHICLE_COLUMNS)
+        writer.writerows(conn.execute(f"SELECT {', '.join(db.VEHICLE_COLUMNS)} FROM vehicles ORDER BY p_key"))
+
+def csv_import(path):
+    # Into an empty database next to the file
+    target = os.path.splitext(path)[0] + '_import.db'
+    pool = db.ConnectionPool(target, size=1)
+    with pool.connection() as conn:
+        db.init_schema(conn)
+        with open(path, 'rb') as f:
+            counts = importer.import_file(conn, f, os.path.basename(path))
+    pool.close()
+    os.remove(target)
+    return counts['inserted']
+
+def generate(pool, count):
+    with pool.transaction() as conn:
+        return generator.generate_vehicles(conn, {"Loader Rickshaw": count})
+
+def run_size(size, repeat, tmp):
+    """{operation: stats} for one fleet size"""
+    from resources import read_frame
+
+    results = {}
+    bulk_repeat = repeat if size <= REPEAT_BULK_UP_TO else 1
+    rows = list(synthetic_fleet(size))
+    pool = db.ConnectionPool(os.path.join(tmp, f"fleet_{size}.db"))
+
+    results['seed'], _ = measure(lambda: seed(pool, rows), 1)
+    results['seed']['rows'] = size
+    del rows
+
+    with pool.connection() as conn:
+        results['dashboard_counts'], _ = measure(lambda: dashboard_counts(conn), repeat)
+        results['search_page'], _ = measure(lambda: search(conn), repeat)
+        results['search_count'], matches = measure(lambda: count_matches(conn), repeat)
+        results['search_count']['rows'] = matches
+        results['full_load'], df = measure(lambda: read_frame(conn, "SELECT * FROM vehicles"), repeat)
+        results['full_load']['rows'] = len(df)
+        del df
+
+        for name, query, title in (('report_type', db.VEHICLE_TYPE_REPORT_SQL, REPORT_TYPE),
+                                   ('report_usage', db.USAGE_REPORT_SQL, REPORT_USAGE)):
+            results[name], pdf_bytes = measure(
+                lambda: pdf_reports_final.generate_vehicle_report_from_query(conn, query, (title,), title), bulk_repeat
+            )
+            results[name]['rows'] = conn.execute(f"SELECT COUNT(*) FROM ({query})", (title,)).fetchone()[0]
+            results[name]['bytes'] = len(pdf_bytes)
+
+        path = os.path.join(tmp, f"fleet_{size}.csv")
+        export_csv(conn, path)
+    results['csv_import'], inserted = measure(lambda: csv_import(path), bulk_repeat)
+    results['csv_import']['rows'] = inserted
+    os.remove(path)
+
+    results['generate'], created = measure(lambda: generate(pool, min(size, GENERATE_VEHICLES)), bulk_repeat)
+    results['generate']['rows'] = created
+    pool.close()
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment(repeat):
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': repeat,
+    }
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare a run with a baseline run
+
+    Returns:
+    - rows: list of (size, operation, baseline ms, ms, ratio, regressed)
+      for every operation present in both
+    """
+    rows = []
+    for size, operations in results['sizes'].items():
+        for name, stats in operations.items():
+            before = baseline.get('sizes', {}).get(size, {}).get(name)
+            if before is None:
+                continue
+            ratio = stats['ms'] / before['ms'] if before['ms'] else float('inf')
+            regressed = ratio > 1 + tolerance and stats['ms'] - before['ms'] >= MIN_REGRESSION_MS
+            rows.append((size, name, before['ms'], stats['ms'], ratio, regressed))
+    return rows
+
+def print_results(results):
+    print(f"{'size':>8} {'operation':<17} {'median ms':>11} {'min ms':>11} {'rows':>9}")
+    for size, operations in results['sizes'].items():
+        for name, stats in operations.items():
+            rows = stats.get('rows', '')
+            print(f"{size:>8} {name:<17} {stats['ms']:>11.1f} {stats['min_ms']:>11.1f} {rows:>9}")
+
+def print_comparison(rows, tolerance):
+    print(f"\nvs baseline (regression: > {tolerance:.0%} and >= {MIN_REGRESSION_MS:g} ms slower)")
+    print(f"{'size':>8} {'operation':<17} {'baseline ms':>12} {'ms':>11} {'ratio':>7}")
+    for size, name, before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{size:>8} {name:<17} {before:>12.1f} {after:>11.1f} {ratio:>7.2f}{flag}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(',')]
+
+    logging.disable(logging.WARNING)  # bare-mode Streamlit warnings from resources
+    results = {'environment': environment(args.repeat), 'sizes': {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            print(f"fleet of {size:,} vehicles...", file=sys.stderr, flush=True)
+            results['sizes'][str(size)] = run_size(size, args.repeat, tmp)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print_results(results)
+    print(f"\nresults written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline to store one")
+        return 0
+    with open(args.baseline) as f:
+        rows = compare(results, json.load(f), args.tolerance)
+    print_comparison(rows, args.tolerance)
+    return 1 if any(row[-1] for row in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# Vehicle types, usage categories, prefixes and usage rules seed the lookup
+# tables (see db._normalize_categories); the running app reads them from the
+# database
+VEHICLE_TYPES = [
+    "Chain Arm Roll", "Compactor", "Dumper (20m3)", "Dumper (5m3)",
+    "Front End Loader", "Loader Rickshaw", "Mechanical Sweeper",
+    "Mini Tipper", "Tractor Loader", "Tractor Trolley",
+    "Water Bowzer", "Gulli Sucker", "Drain Cleaner"
+]
+
+USAGE_CATEGORIES = [
+    "Container Base Collection", "Secondary Waste Collection",
+    "Bulk Waste Collection", "Door to Door (Residential)",
+    "Mechanical Sweeping", "Door to Door (Commercial)",
+    "Mechanical Washing", "Dumpsite Management"
+]
+
+# Vehicle type to ID prefix mapping
+VEH_ID_PREFIXES = {
+    "Chain Arm Roll": "AR",
+    "Compactor": "C",
+    "Dumper (20m3)": "D",
+    "Dumper (5m3)": "D",
+    "Front End Loader": "FL",
+    "Loader Rickshaw": "LR",
+    "Mechanical Sweeper": "MS",
+    "Mini Tipper": "MT",
+    "Tractor Loader": "TL",
+    "Tractor Trolley": "TT",
+    "Water Bowzer": "MW",
+    "Gulli Sucker": "GS",
+    "Drain Cleaner": "DC"
+}
+
+# Zero-padded width of the VEH_ID number for each prefix (AR-001, FL-01)
+VEH_ID_DIGITS = {
+    "AR": 3, "C": 3, "D": 3, "LR": 3,
+    "FL": 2, "MS": 2, "MT": 2, "TL": 2,
+    "TT": 2, "MW": 2, "GS": 2, "DC": 2
+}
+
+def format_veh_id(prefix, number):
+    return f"{prefix}-{number:0{VEH_ID_DIGITS[prefix]}d}"
+
+# Auto-assignment rules for usage categories
+USAGE_RULES = {
+    "Chain Arm Roll": "Container Base Collection",
+    "Compactor": "Container Base Collection",
+    "Dumper (20m3)": "Secondary Waste Collection",
+    "Dumper (5m3)": "Secondary Waste Collection",
+    "Front End Loader": "Secondary Waste Collection",
+    "Loader Rickshaw": "Door to Door (Residential)",
+    "Mechanical Sweeper": "Mechanical Sweeping",
+    "Mini Tipper": "Door to Door (Commercial)",
+    "Tractor Loader": "Bulk Waste Collection",
+    "Tractor Trolley": "Bulk Waste Collection",
+    "Water Bowzer": "Mechanical Washing",
+    "Gulli Sucker": "Dumpsite Management",
+    "Drain Cleaner": ""
+}
@@ -0,0 +1,1038 @@
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+import queue
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import perf
+
+DB_PATH = 'vehicles.db'
+
+# Pragmas applied to every pooled connection
+PRAGMAS = {
+    "journal_mode": "WAL",      # readers don't block the writer
+    "synchronous": "NORMAL",    # safe with WAL, far fewer fsyncs than FULL
+    "cache_size": -64000,       # ~64 MB page cache per connection
+    "mmap_size": 268435456,     # 256 MB memory-mapped I/O
+    "temp_store": "MEMORY",
+    "foreign_keys": "ON",
+    "recursive_triggers": "ON", # INSERT OR REPLACE fires delete triggers too
+    "busy_timeout": 3000,       # ms a writer waits for the lock before SQLITE_BUSY
+}
+
+# Whole-transaction retries of ConnectionPool.write once busy_timeout has
+# run out, with exponential backoff from RETRY_DELAY seconds
+WRITE_RETRIES = 3
+RETRY_DELAY = 0.1
+
+VEHICLE_COLUMNS = ('VEH_ID', 'REG_NO', 'VEHICLE_TYPE', 'MAKE', 'MODEL', 'YEAR', 'OWNER', 'USED_FOR')
+
+# Single-row inserts through the vehicles view; bulk writes go straight to
+# vehicle_records with the *_RECORD_SQL statements below
+INSERT_VEHICLE_SQL = (
+    f"INSERT INTO vehicles ({', '.join(VEHICLE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(VEHICLE_COLUMNS))})"
+)
+
+# Lookup tables behind the categorical columns of the vehicles view:
+# column -> (table, id column)
+CATEGORY_TABLES = {
+    'VEHICLE_TYPE': ('vehicle_types', 'type_id'),
+    'OWNER': ('owners', 'owner_id'),
+    'USED_FOR': ('usage_categories', 'usage_id'),
+}
+
+# Columns of vehicle_records, matching VEHICLE_COLUMNS with ids for names
+RECORD_COLUMNS = tuple(CATEGORY_TABLES[col][1] if col in CATEGORY_TABLES else col for col in VEHICLE_COLUMNS)
+
+INSERT_RECORD_SQL = (
+    f"INSERT INTO vehicle_records ({', '.join(RECORD_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(RECORD_COLUMNS))})"
+)
+
+# Insert, or overwrite every column of the vehicle with the same VEH_ID.
+# Every write that changes a vehicle also bumps its row version.
+UPSERT_RECORD_SQL = (
+    f"{INSERT_RECORD_SQL} ON CONFLICT(VEH_ID) DO UPDATE SET "
+    + ', '.join(f"{col} = excluded.{col}" for col in RECORD_COLUMNS[1:])
+    + ", version = vehicle_records.version + 1"
+)
+
+# Same, but leaves the row untouched when no column actually differs
+SYNC_RECORD_SQL = (
+    f"{UPSERT_RECORD_SQL} WHERE "
+    + ' OR '.join(f"vehicle_records.{col} IS NOT excluded.{col}" for col in RECORD_COLUMNS[1:])
+)
+
+# Overwrite one vehicle only if nobody changed it since it was read
+UPDATE_RECORD_SQL = (
+    "UPDATE vehicle_records SET "
+    + ', '.join(f"{col} = ?" for col in RECORD_COLUMNS[1:])
+    + ", version = version + 1 WHERE VEH_ID = ? AND version = ?"
+)
+
+# Text columns mirrored into the vehicles_fts search index
+SEARCH_COLUMNS = ('VEH_ID', 'REG_NO', 'VEHICLE_TYPE', 'MAKE', 'MODEL', 'OWNER', 'USED_FOR')
+
+# Trigram tokens need at least this many characters to match
+MIN_FTS_TERM = 3
+
+class ConnectionPool:
+    """Process-wide pool of SQLite connections
+
+    Each connection is handed to a single thread at a time, so Streamlit's
+    script threads can share the pool without sharing a connection.
+    """
+    def __init__(self, path=DB_PATH, size=8):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        # Pool exhausted, wait for another thread to hand one back
+        return self._idle.get()
+
+    def _release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of the block"""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection and run the block in one write transaction"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            else:
+                conn.commit()
+
+    def write(self, func, *args, **kwargs):
+        """
+        Run func(conn, *args, **kwargs) in one write transaction, return its result
+
+        A writer already waits busy_timeout for the lock. If another one
+        holds it longer than that, the transaction is rolled back and run
+        again, up to WRITE_RETRIES times with exponential backoff and
+        jitter, before the "database is locked" error reaches the caller.
+        func must therefore be safe to run again from the start.
+        """
+        for attempt in range(WRITE_RETRIES + 1):
+            try:
+                with self.transaction() as conn:
+                    return func(conn, *args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if attempt == WRITE_RETRIES or not is_locked_error(e):
+                    raise
+            time.sleep(RETRY_DELAY * 2 ** attempt * random.uniform(0.5, 1.5))
+
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+def is_locked_error(error):
+    """True for SQLITE_BUSY / SQLITE_LOCKED errors, which are worth retrying"""
+    return isinstance(error, sqlite3.OperationalError) and "is locked" in str(error)
+
+def init_schema(conn):
+    """Create the vehicles table if it doesn't exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS vehicles (
+            p_key INTEGER PRIMARY KEY AUTOINCREMENT,
+            VEH_ID TEXT UNIQUE,
+            REG_NO TEXT,
+            VEHICLE_TYPE TEXT,
+            MAKE TEXT,
+            MODEL TEXT,
+            YEAR INTEGER,
+            OWNER TEXT,
+            USED_FOR TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS veh_id_sequences (
+            prefix TEXT PRIMARY KEY,
+            last_value INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    # Survives drop_schema so the data version only ever goes up
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS vms_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    # Only write when a row is missing: an INSERT takes the write lock even
+    # when it ignores the row, and a long job may be holding that lock
+    seeded = conn.execute("SELECT COUNT(*) FROM vms_meta WHERE key IN ('data_version', 'database_id')").fetchone()[0]
+    if seeded < 2:
+        conn.execute("INSERT OR IGNORE INTO vms_meta (key, value) VALUES ('data_version', 0)")
+        # Random id telling this database apart from a replaced or restored file
+        conn.execute("INSERT OR IGNORE INTO vms_meta (key, value) VALUES ('database_id', abs(random() % 9223372036854775807))")
+    _create_search_index(conn)
+    migrate(conn)
+    conn.commit()
+
+def _add_lookup_indexes(conn):
+    # Report and dashboard filters; the second column keeps type/usage
+    # breakdowns covered by the index alone
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_type ON vehicles (VEHICLE_TYPE, USED_FOR)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_used_for ON vehicles (USED_FOR, VEHICLE_TYPE)")
+    # Case-insensitive registration lookups
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_vehicles_reg_no ON vehicles (REG_NO COLLATE NOCASE)")
+    conn.execute("ANALYZE vehicles")
+
+def _add_row_hashes(conn):
+    # Hash of each vehicle as last imported; any other write clears it
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS vehicle_row_hashes (
+            VEH_ID TEXT PRIMARY KEY,
+            row_hash TEXT NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    for event in ('UPDATE', 'DELETE'):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS vehicle_row_hashes_{event.lower()} AFTER {event} ON vehicles BEGIN
+                DELETE FROM vehicle_row_hashes WHERE VEH_ID = old.VEH_ID;
+            END
+        ''')
+
+# Columns the dashboard breaks the fleet down by; vehicle_stats also keeps
+# the fleet total under the TOTAL dimension
+STATS_DIMENSIONS = ('VEHICLE_TYPE', 'USED_FOR', 'OWNER')
+
+def _stats_change(row, delta, value=lambda row, col: f"{row}.{col}"):
+    # Statements applying delta to the counters of one vehicle row (new/old);
+    # value(row, col) is the SQL expression for a column of that row
+    keys = [f"('{dim}', COALESCE({value(row, dim)}, ''))" for dim in STATS_DIMENSIONS] + ["('TOTAL', '')"]
+    statements = []
+    for key in keys:
+        statements.append(
+            f"INSERT INTO vehicle_stats (dimension, value, count) VALUES {key[:-1]}, {delta}) "
+            f"ON CONFLICT (dimension, value) DO UPDATE SET count = count + {delta};"
+        )
+        if delta < 0:
+            statements.append(f"DELETE FROM vehicle_stats WHERE (dimension, value) = {key} AND count <= 0;")
+    return '\n'.join(statements)
+
+def _add_vehicle_stats(conn):
+    # Vehicle counts per type, usage and owner, maintained by triggers so
+    # the dashboard reads a few dozen rows instead of grouping the fleet
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS vehicle_stats (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS vehicle_stats_insert AFTER INSERT ON vehicles BEGIN
+            {_stats_change('new', 1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS vehicle_stats_delete AFTER DELETE ON vehicles BEGIN
+            {_stats_change('old', -1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS vehicle_stats_update AFTER UPDATE OF {', '.join(STATS_DIMENSIONS)} ON vehicles BEGIN
+            {_stats_change('old', -1)}
+            {_stats_change('new', 1)}
+        END
+    ''')
+    rebuild_stats(conn)
+
+def _record_value(row, col):
+    # SQL for a vehicles column of a vehicle_records trigger row (new/old)
+    if col in CATEGORY_TABLES:
+        table, id_column = CATEGORY_TABLES[col]
+        return f"(SELECT name FROM {table} WHERE {id_column} = {row}.{id_column})"
+    return f"{row}.{col}"
+
+def _seed_categories(conn):
+    # Type and usage lists shipped in constants, plus any value already in use
+    from constants import VEHICLE_TYPES, USAGE_CATEGORIES, VEH_ID_PREFIXES, USAGE_RULES
+    conn.executemany("INSERT OR IGNORE INTO usage_categories (name) VALUES (?)",
+                     ((usage,) for usage in USAGE_CATEGORIES))
+    conn.executemany(
+        "INSERT OR IGNORE INTO vehicle_types (name, veh_id_prefix, default_usage_id) "
+        "VALUES (?, ?, (SELECT usage_id FROM usage_categories WHERE name = ?))",
+        ((vehicle_type, VEH_ID_PREFIXES.get(vehicle_type), USAGE_RULES.get(vehicle_type))
+         for vehicle_type in VEHICLE_TYPES)
+    )
+    for col, (table, _) in CATEGORY_TABLES.items():
+        # Blank values become NULL ids rather than a category of their own
+        conn.execute(f"INSERT OR IGNORE INTO {table} (name) SELECT DISTINCT {col} FROM vehicles WHERE {col} <> ''")
+
+def _view_write_sql():
+    # Trigger statements for writes through the vehicles view: check the
+    # names, register new owners, and the ids to store in vehicle_records
+    checks = '\n'.join(
+        f"SELECT RAISE(ABORT, 'Unknown {col}') WHERE new.{col} IS NOT NULL "
+        f"AND NOT EXISTS (SELECT 1 FROM {CATEGORY_TABLES[col][0]} WHERE name = new.{col});"
+        for col in ('VEHICLE_TYPE', 'USED_FOR')
+    )
+    # NOT EXISTS rather than OR IGNORE: an outer INSERT OR REPLACE would
+    # otherwise turn this into a REPLACE of the owner row
+    add_owner = ("INSERT INTO owners (name) SELECT new.OWNER WHERE new.OWNER IS NOT NULL "
+                 "AND NOT EXISTS (SELECT 1 FROM owners WHERE name = new.OWNER);")
+    new_values = ', '.join(
+        f"(SELECT {CATEGORY_TABLES[col][1]} FROM {CATEGORY_TABLES[col][0]} WHERE name = new.{col})"
+        if col in CATEGORY_TABLES else f"new.{col}"
+        for col in VEHICLE_COLUMNS
+    )
+    return checks, add_owner, new_values
+
+def _normalize_categories(conn):
+    # VEHICLE_TYPE, OWNER and USED_FOR move to lookup tables referenced by
+    # integer keys. vehicle_records holds the rows and "vehicles" becomes a
+    # view with the old columns, so reads keep working unchanged and writes
+    # through it are translated by INSTEAD OF triggers.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS usage_categories (
+            usage_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS vehicle_types (
+            type_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            veh_id_prefix TEXT,
+            default_usage_id INTEGER REFERENCES usage_categories (usage_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS owners (
+            owner_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    _seed_categories(conn)
+
+    conn.execute('''
+        CREATE TABLE vehicle_records (
+            p_key INTEGER PRIMARY KEY AUTOINCREMENT,
+            VEH_ID TEXT UNIQUE,
+            REG_NO TEXT,
+            type_id INTEGER REFERENCES vehicle_types (type_id),
+            MAKE TEXT,
+            MODEL TEXT,
+            YEAR INTEGER,
+            owner_id INTEGER REFERENCES owners (owner_id),
+            usage_id INTEGER REFERENCES usage_categories (usage_id)
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO vehicle_records (p_key, VEH_ID, REG_NO, type_id, MAKE, MODEL, YEAR, owner_id, usage_id)
+        SELECT v.p_key, v.VEH_ID, v.REG_NO, t.type_id, v.MAKE, v.MODEL, v.YEAR, o.owner_id, u.usage_id
+        FROM vehicles v
+        LEFT JOIN vehicle_types t ON t.name = v.VEHICLE_TYPE
+        LEFT JOIN owners o ON o.name = v.OWNER
+        LEFT JOIN usage_categories u ON u.name = v.USED_FOR
+        ORDER BY v.p_key
+    ''')
+    # Its indexes and triggers go with it
+    conn.execute("DROP TABLE vehicles")
+
+    conn.execute('''
+        CREATE VIEW vehicles AS
+        SELECT r.p_key AS p_key, r.VEH_ID AS VEH_ID, r.REG_NO AS REG_NO, t.name AS VEHICLE_TYPE,
+               r.MAKE AS MAKE, r.MODEL AS MODEL, r.YEAR AS YEAR, o.name AS OWNER, u.name AS USED_FOR
+        FROM vehicle_records r
+        LEFT JOIN vehicle_types t ON t.type_id = r.type_id
+        LEFT JOIN owners o ON o.owner_id = r.owner_id
+        LEFT JOIN usage_categories u ON u.usage_id = r.usage_id
+    ''')
+    conn.execute("CREATE INDEX idx_records_type ON vehicle_records (type_id, usage_id)")
+    conn.execute("CREATE INDEX idx_records_usage ON vehicle_records (usage_id, type_id)")
+    conn.execute("CREATE INDEX idx_records_owner ON vehicle_records (owner_id)")
+    conn.execute("CREATE INDEX idx_records_reg_no ON vehicle_records (REG_NO COLLATE NOCASE)")
+
+    checks, add_owner, new_values = _view_write_sql()
+    conn.execute(f'''
+        CREATE TRIGGER vehicles_view_insert INSTEAD OF INSERT ON vehicles BEGIN
+            {checks}
+            {add_owner}
+            INSERT INTO vehicle_records (p_key, {', '.join(RECORD_COLUMNS)}) VALUES (new.p_key, {new_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER vehicles_view_update INSTEAD OF UPDATE ON vehicles BEGIN
+            {checks}
+            {add_owner}
+            UPDATE vehicle_records SET ({', '.join(RECORD_COLUMNS)}) = ({new_values}) WHERE p_key = old.p_key;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER vehicles_view_delete INSTEAD OF DELETE ON vehicles BEGIN
+            DELETE FROM vehicle_records WHERE p_key = old.p_key;
+        END
+    ''')
+
+    # The search index, row hashes and counters now follow vehicle_records
+    columns = ', '.join(SEARCH_COLUMNS)
+    old_values = ', '.join(_record_value('old', col) for col in SEARCH_COLUMNS)
+    new_search_values = ', '.join(_record_value('new', col) for col in SEARCH_COLUMNS)
+    conn.execute(f'''
+        CREATE TRIGGER vehicles_fts_insert AFTER INSERT ON vehicle_records BEGIN
+            INSERT INTO vehicles_fts (rowid, {columns}) VALUES (new.p_key, {new_search_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER vehicles_fts_delete AFTER DELETE ON vehicle_records BEGIN
+            INSERT INTO vehicles_fts (vehicles_fts, rowid, {columns}) VALUES ('delete', old.p_key, {old_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER vehicles_fts_update AFTER UPDATE ON vehicle_records BEGIN
+            INSERT INTO vehicles_fts (vehicles_fts, rowid, {columns}) VALUES ('delete', old.p_key, {old_values});
+            INSERT INTO vehicles_fts (rowid, {columns}) VALUES (new.p_key, {new_search_values});
+        END
+    ''')
+    for event in ('UPDATE', 'DELETE'):
+        conn.execute(f'''
+            CREATE TRIGGER vehicle_row_hashes_{event.lower()} AFTER {event} ON vehicle_records BEGIN
+                DELETE FROM vehicle_row_hashes WHERE VEH_ID = old.VEH_ID;
+            END
+        ''')
+    conn.execute(f'''
+        CREATE TRIGGER vehicle_stats_insert AFTER INSERT ON vehicle_records BEGIN
+            {_stats_change('new', 1, _record_value)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER vehicle_stats_delete AFTER DELETE ON vehicle_records BEGIN
+            {_stats_change('old', -1, _record_value)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER vehicle_stats_update AFTER UPDATE OF type_id, usage_id, owner_id ON vehicle_records BEGIN
+            {_stats_change('old', -1, _record_value)}
+            {_stats_change('new', 1, _record_value)}
+        END
+    ''')
+    # Not a bare ANALYZE: statistics on the FTS shadow tables slow down
+    # every insert into the search index
+    for table in ('vehicle_records', 'vehicle_types', 'usage_categories', 'owners'):
+        conn.execute(f"ANALYZE {table}")
+
+def _add_row_versions(conn):
+    # Optimistic locking: every change to a vehicle bumps its version, and
+    # update_vehicle only writes if the version it was given is current
+    conn.execute("ALTER TABLE vehicle_records ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+    checks, add_owner, new_values = _view_write_sql()
+    conn.execute("DROP TRIGGER vehicles_view_update")
+    conn.execute(f'''
+        CREATE TRIGGER vehicles_view_update INSTEAD OF UPDATE ON vehicles BEGIN
+            {checks}
+            {add_owner}
+            UPDATE vehicle_records SET ({', '.join(RECORD_COLUMNS)}, version) = ({new_values}, version + 1)
+            WHERE p_key = old.p_key;
+        END
+    ''')
+
+# Schema changes applied in order; PRAGMA user_version records how many ran
+MIGRATIONS = [
+    _add_lookup_indexes,
+    _add_row_hashes,
+    _add_vehicle_stats,
+    _normalize_categories,
+    _add_row_versions,
+]
+
+def migrate(conn):
+    """Apply any migrations this database hasn't seen yet"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        migration(conn)
+        conn.execute(f"PRAGMA user_version = {number}")
+
+def _create_search_index(conn):
+    # External-content FTS5 table over vehicles, kept in sync by triggers
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vehicles_fts'"
+    ).fetchone()
+    if exists:
+        return
+    
+    columns = ', '.join(SEARCH_COLUMNS)
+    old_values = ', '.join(f'old.{col}' for col in SEARCH_COLUMNS)
+    new_values = ', '.join(f'new.{col}' for col in SEARCH_COLUMNS)
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE vehicles_fts USING fts5(
+            {columns},
+            content='vehicles', content_rowid='p_key', tokenize='trigram'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS vehicles_fts_insert AFTER INSERT ON vehicles BEGIN
+            INSERT INTO vehicles_fts (rowid, {columns}) VALUES (new.p_key, {new_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS vehicles_fts_delete AFTER DELETE ON vehicles BEGIN
+            INSERT INTO vehicles_fts (vehicles_fts, rowid, {columns}) VALUES ('delete', old.p_key, {old_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS vehicles_fts_update AFTER UPDATE ON vehicles BEGIN
+            INSERT INTO vehicles_fts (vehicles_fts, rowid, {columns}) VALUES ('delete', old.p_key, {old_values});
+            INSERT INTO vehicles_fts (rowid, {columns}) VALUES (new.p_key, {new_values});
+        END
+    ''')
+    # Index any rows that predate the search table
+    conn.execute("INSERT INTO vehicles_fts (vehicles_fts) VALUES ('rebuild')")
+
+def _search_filter(search_term, search_field):
+    """
+    Return (source, key, where, params) restricting vehicles to a search
+    
+    Terms of MIN_FTS_TERM characters or more go through the vehicles_fts
+    trigram index, which matches substrings like LIKE '%term%' does.
+    Shorter terms have no trigram to look up and fall back to LIKE.
+    """
+    if not search_term:
+        return "vehicles", "vehicles.p_key", [], []
+    
+    if search_field != "All Fields" and search_field not in SEARCH_COLUMNS:
+        raise ValueError(f"Unknown search field: {search_field}")
+    fields = SEARCH_COLUMNS if search_field == "All Fields" else (search_field,)
+    
+    if len(search_term) < MIN_FTS_TERM:
+        where = '(' + ' OR '.join(f'{col} LIKE ?' for col in fields) + ')'
+        return "vehicles", "vehicles.p_key", [where], [f"%{search_term}%"] * len(fields)
+    
+    phrase = '"' + search_term.replace('"', '""') + '"'
+    if search_field != "All Fields":
+        phrase = f"{{{search_field}}} : {phrase}"
+    # CROSS JOIN keeps the FTS table outermost so it drives the rowid order
+    source = "vehicles_fts CROSS JOIN vehicles ON vehicles.p_key = vehicles_fts.rowid"
+    return source, "vehicles_fts.rowid", ["vehicles_fts MATCH ?"], [phrase]
+
+def search_query(search_term="", search_field="All Fields", after=None, limit=None):
+    """
+    Build the SQL and parameters for the All Vehicles search
+    
+    Results are ordered by p_key. Pass the last p_key of the previous page
+    as `after` together with `limit` to fetch one page (keyset pagination).
+    """
+    source, key, where, params = _search_filter(search_term, search_field)
+    if after is not None:
+        where.append(f"{key} > ?")
+        params.append(after)
+    query = f"SELECT vehicles.* FROM {source}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {key}"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return query, tuple(params)
+
+def count_query(search_term="", search_field="All Fields"):
+    """SQL and parameters counting the rows search_query would return"""
+    source, _, where, params = _search_filter(search_term, search_field)
+    query = f"SELECT COUNT(*) FROM {source}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    return query, tuple(params)
+
+# Fields that can be set across many vehicles at once
+BULK_UPDATE_COLUMNS = ('OWNER', 'USED_FOR', 'MAKE', 'MODEL', 'YEAR')
+
+def _selection_filter(veh_ids, search):
+    # WHERE clause and parameters for an explicit VEH_ID list, or for every
+    # vehicle matching a (search_term, search_field) pair
+    if (veh_ids is None) == (search is None):
+        raise ValueError("Pass either veh_ids or search")
+    if veh_ids is not None:
+        # One JSON parameter instead of one placeholder per VEH_ID
+        return "VEH_ID IN (SELECT value FROM json_each(?))", [json.dumps(list(veh_ids))]
+    source, key, where, params = _search_filter(*search)
+    if not where:
+        return "1", []
+    return f"p_key IN (SELECT {key} FROM {source} WHERE {' AND '.join(where)})", params
+
+@perf.instrument("db: delete_vehicles", rows=int)
+def delete_vehicles(conn, veh_ids=None, search=None):
+    """
+    Delete a set of vehicles with one statement, returns the number deleted
+
+    Pass veh_ids for an explicit selection, or search as a
+    (search_term, search_field) pair for everything the All Vehicles
+    search matches. The caller owns the transaction.
+    """
+    where, params = _selection_filter(veh_ids, search)
+    return conn.execute(f"DELETE FROM vehicle_records WHERE {where}", params).rowcount
+
+@perf.instrument("db: update_vehicles", rows=int)
+def update_vehicles(conn, column, value, veh_ids=None, search=None):
+    """
+    Set one field on a set of vehicles with one statement
+
+    The selection works as in delete_vehicles. Vehicles that already hold
+    value are left alone, so only real changes fire the triggers.
+    Returns the number of vehicles changed.
+    """
+    if column not in BULK_UPDATE_COLUMNS:
+        raise ValueError(f"{column} cannot be bulk updated")
+    target, new_value = column, "?"
+    if column in CATEGORY_TABLES:
+        # Store the id of the name instead
+        table, target = CATEGORY_TABLES[column]
+        new_value = f"(SELECT {target} FROM {table} WHERE name = ?)"
+        if column == 'OWNER':
+            _add_owners(conn, [value])
+        elif value is not None and not conn.execute(f"SELECT 1 FROM {table} WHERE name = ?", (value,)).fetchone():
+            raise ValueError(f"Unknown {column} {value!r}")
+    where, params = _selection_filter(veh_ids, search)
+    return conn.execute(
+        f"UPDATE vehicle_records SET {target} = {new_value}, version = version + 1 "
+        f"WHERE ({where}) AND {target} IS NOT {new_value}",
+        [value] + params + [value]
+    ).rowcount
+
+def find_veh_ids(conn, prefix, limit=20):
+    """VEH_IDs starting with prefix, for type-ahead pickers"""
+    prefix = prefix.strip().upper()
+    rows = conn.execute(VEH_ID_PICKER_SQL, (prefix, prefix + '\U0010ffff', limit))
+    return [row[0] for row in rows]
+
+def drop_schema(conn):
+    """Drop all vehicle data tables (vms_meta is kept)"""
+    # vehicles is a view once the categories are normalized
+    kind = conn.execute("SELECT type FROM sqlite_master WHERE name = 'vehicles'").fetchone()
+    if kind:
+        conn.execute(f'DROP {kind[0].upper()} vehicles')
+    conn.execute('DROP TABLE IF EXISTS vehicles_fts')
+    conn.execute('DROP TABLE IF EXISTS vehicle_records')
+    conn.execute('DROP TABLE IF EXISTS vehicle_types')
+    conn.execute('DROP TABLE IF EXISTS usage_categories')
+    conn.execute('DROP TABLE IF EXISTS owners')
+    conn.execute('DROP TABLE IF EXISTS veh_id_sequences')
+    conn.execute('DROP TABLE IF EXISTS vehicle_row_hashes')
+    conn.execute('DROP TABLE IF EXISTS vehicle_stats')
+    conn.execute('PRAGMA user_version = 0')
+    conn.commit()
+
+def reset_database(conn):
+    """Delete every vehicle and recreate an empty schema"""
+    drop_schema(conn)
+    init_schema(conn)
+    bump_data_version(conn)
+    conn.commit()
+
+VEHICLE_TYPE_REPORT_SQL = "SELECT * FROM vehicles WHERE VEHICLE_TYPE = ?"
+USAGE_REPORT_SQL = "SELECT * FROM vehicles WHERE USED_FOR = ?"
+REG_NO_LOOKUP_SQL = "SELECT VEH_ID FROM vehicles WHERE REG_NO = ? COLLATE NOCASE"
+VEH_ID_PICKER_SQL = "SELECT VEH_ID FROM vehicle_records WHERE VEH_ID >= ? AND VEH_ID < ? ORDER BY VEH_ID LIMIT ?"
+VEHICLE_STATS_SQL = "SELECT value, count FROM vehicle_stats WHERE dimension = ? ORDER BY count DESC, value"
+VEHICLE_TYPE_NAMES_SQL = "SELECT name FROM vehicle_types ORDER BY type_id"
+USAGE_CATEGORY_NAMES_SQL = "SELECT name FROM usage_categories ORDER BY usage_id"
+
+# Low-cardinality columns loaded as pandas categoricals
+CATEGORICAL_COLUMNS = tuple(CATEGORY_TABLES)
+
+# Queries that must be served by an index, with sample parameters
+INDEXED_QUERIES = {
+    "vehicle type report": (VEHICLE_TYPE_REPORT_SQL, ("Compactor",)),
+    "usage report": (USAGE_REPORT_SQL, ("Mechanical Sweeping",)),
+    "registration lookup": (REG_NO_LOOKUP_SQL, ("aaw-20-9370",)),
+    "VEH_ID lookup": ("SELECT * FROM vehicles WHERE VEH_ID = ?", ("LR-01",)),
+    "VEH_ID sequence": ("SELECT last_value FROM veh_id_sequences WHERE prefix = ?", ("LR",)),
+    "vehicle page": search_query(after=100, limit=50),
+    "search page": search_query("AAW-20", after=100, limit=50),
+    "vehicle stats": (VEHICLE_STATS_SQL, ("VEHICLE_TYPE",)),
+    "VEH_ID picker": (VEH_ID_PICKER_SQL, ("LR", "LS", 20)),
+}
+
+def query_plan_scans(conn, queries=INDEXED_QUERIES):
+    """
+    Return {name: plan detail} for every query that full-scans a table
+    
+    Uses EXPLAIN QUERY PLAN, so the queries are not actually run.
+    """
+    scans = {}
+    for name, (query, params) in queries.items():
+        for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params):
+            detail = row[-1]
+            if detail.startswith('SCAN') and 'INDEX' not in detail:
+                scans[name] = detail
+    return scans
+
+def find_by_reg_no(conn, reg_no):
+    """VEH_IDs registered under reg_no, ignoring case"""
+    return [row[0] for row in conn.execute(REG_NO_LOOKUP_SQL, (reg_no,))]
+
+def _highest_veh_id_number(conn, prefix):
+    # GLOB is case sensitive, so it can use the VEH_ID unique index
+    highest = 0
+    rows = conn.execute(
+        "SELECT VEH_ID FROM vehicle_records WHERE VEH_ID GLOB ?", (prefix + '*',)
+    )
+    for (veh_id,) in rows:
+        number = veh_id[len(prefix):].lstrip('-')
+        if number.isdigit():
+            highest = max(highest, int(number))
+    return highest
+
+def allocate_ids(conn, prefix, count):
+    """
+    Reserve `count` consecutive VEH_ID numbers for a prefix
+    
+    Must be called inside the transaction that inserts the vehicles so the
+    counter and the rows commit together. A prefix seen for the first time
+    is seeded from the highest existing VEH_ID, so imported vehicles are
+    continued rather than collided with.
+    
+    Returns the first reserved number.
+    """
+    row = conn.execute(
+        "SELECT last_value FROM veh_id_sequences WHERE prefix = ?", (prefix,)
+    ).fetchone()
+    last_value = row[0] if row else _highest_veh_id_number(conn, prefix)
+    conn.execute(
+        "INSERT OR REPLACE INTO veh_id_sequences (prefix, last_value) VALUES (?, ?)",
+        (prefix, last_value + count)
+    )
+    return last_value + 1
+
+def vehicle_type_names(conn):
+    """Vehicle types in display order"""
+    return [row[0] for row in conn.execute(VEHICLE_TYPE_NAMES_SQL)]
+
+def usage_category_names(conn):
+    """Usage categories in display order"""
+    return [row[0] for row in conn.execute(USAGE_CATEGORY_NAMES_SQL)]
+
+def vehicle_type_rules(conn):
+    """{vehicle type: (VEH_ID prefix, default usage category)}"""
+    rows = conn.execute('''
+        SELECT t.name, t.veh_id_prefix, u.name FROM vehicle_types t
+        LEFT JOIN usage_categories u ON u.usage_id = t.default_usage_id
+        ORDER BY t.type_id
+    ''')
+    return {name: (prefix, usage) for name, prefix, usage in rows}
+
+def _add_owners(conn, names):
+    # Register owners seen for the first time
+    conn.executemany(
+        "INSERT INTO owners (name) SELECT ? WHERE NOT EXISTS (SELECT 1 FROM owners WHERE name = ?)",
+        ((name, name) for name in set(names) if name is not None)
+    )
+
+def _to_records(conn, rows):
+    # Rows in VEHICLE_COLUMNS order -> vehicle_records rows in RECORD_COLUMNS
+    # order. Unknown owners are added; unknown types and usages are errors.
+    type_index, owner_index, usage_index = (VEHICLE_COLUMNS.index(col) for col in ('VEHICLE_TYPE', 'OWNER', 'USED_FOR'))
+    owners = {row[owner_index] for row in rows} - {None}
+    ids = {
+        'VEHICLE_TYPE': dict(conn.execute("SELECT name, type_id FROM vehicle_types")),
+        'USED_FOR': dict(conn.execute("SELECT name, usage_id FROM usage_categories")),
+        'OWNER': dict(conn.execute(
+            "SELECT name, owner_id FROM owners WHERE name IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(owners)),)
+        )),
+    }
+    new_owners = owners - ids['OWNER'].keys()
+    if new_owners:
+        _add_owners(conn, new_owners)
+        ids['OWNER'].update(conn.execute(
+            "SELECT name, owner_id FROM owners WHERE name IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(new_owners)),)
+        ))
+
+    records = []
+    for row in rows:
+        record = list(row)
+        for index, col in ((type_index, 'VEHICLE_TYPE'), (owner_index, 'OWNER'), (usage_index, 'USED_FOR')):
+            name = row[index]
+            if name is not None:
+                if name not in ids[col]:
+                    raise ValueError(f"Unknown {col} {name!r}")
+                record[index] = ids[col][name]
+        records.append(record)
+    return records
+
+@perf.instrument("db: insert_vehicles", rows=int)
+def insert_vehicles(conn, rows, chunk_size=5000, progress=None):
+    """
+    Insert vehicle rows (tuples in VEHICLE_COLUMNS order) with executemany
+    
+    Rows are written in chunks; `progress(done, total)` is called after each
+    one. The caller owns the transaction.
+    """
+    total = len(rows)
+    for start in range(0, total, chunk_size):
+        conn.executemany(INSERT_RECORD_SQL, _to_records(conn, rows[start:start + chunk_size]))
+        if progress:
+            progress(min(start + chunk_size, total), total)
+    return total
+
+class ConcurrentEditError(Exception):
+    """A vehicle was changed or deleted by someone else after it was read"""
+
+def vehicle_version(conn, veh_id):
+    """Row version of a vehicle, or None if there is no such VEH_ID"""
+    row = conn.execute("SELECT version FROM vehicle_records WHERE VEH_ID = ?", (veh_id,)).fetchone()
+    return row[0] if row else None
+
+def read_vehicle(conn, veh_id):
+    """The vehicle as a dict of view columns, and its row version; (None, None) if missing"""
+    cursor = conn.execute(
+        "SELECT vehicles.*, vehicle_records.version FROM vehicles "
+        "JOIN vehicle_records ON vehicle_records.p_key = vehicles.p_key WHERE vehicles.VEH_ID = ?", (veh_id,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None, None
+    vehicle = dict(zip([d[0] for d in cursor.description], row))
+    return vehicle, vehicle.pop('version')
+
+def add_vehicle(conn, values):
+    """
+    Insert one new vehicle (a tuple in VEHICLE_COLUMNS order)
+
+    Raises ValueError if the VEH_ID is taken, instead of replacing that
+    vehicle. A VEH_ID typed by hand past a prefix's counter moves the
+    counter on, so the next generation doesn't hand out the same ID.
+    Returns the new vehicle's row version.
+    """
+    if vehicle_version(conn, values[0]) is not None:
+        raise ValueError(f"Vehicle {values[0]} already exists")
+    conn.execute(INSERT_RECORD_SQL, _to_records(conn, [values])[0])
+    _advance_sequence(conn, values[0])
+    return 1
+
+def update_vehicle(conn, values, version):
+    """
+    Overwrite one vehicle, provided nobody changed it since it was read
+
+    Parameters:
+    - values: tuple in VEHICLE_COLUMNS order; its VEH_ID picks the vehicle
+    - version: the vehicle_version read together with the old values
+
+    Returns:
+    - version: the vehicle's new row version
+
+    Raises ConcurrentEditError, leaving the vehicle alone, if its version
+    has moved on or it was deleted in the meantime.
+    """
+    veh_id = values[0]
+    record = _to_records(conn, [values])[0]
+    if conn.execute(UPDATE_RECORD_SQL, record[1:] + [veh_id, version]).rowcount:
+        return version + 1
+    current = vehicle_version(conn, veh_id)
+    if current is None:
+        raise ConcurrentEditError(f"Vehicle {veh_id} was deleted by another user")
+    raise ConcurrentEditError(
+        f"Vehicle {veh_id} was changed by another user since it was opened "
+        f"(version {current}, this edit started from version {version})"
+    )
+
+@perf.instrument("db: upsert_vehicles", rows=int)
+def upsert_vehicles(conn, rows):
+    """Insert rows, overwriting vehicles with the same VEH_ID; returns len(rows)"""
+    if rows:
+        conn.executemany(UPSERT_RECORD_SQL, _to_records(conn, rows))
+    return len(rows)
+
+@perf.instrument("db: sync_vehicles", rows=int)
+def sync_vehicles(conn, rows):
+    """Upsert rows, leaving identical vehicles alone; returns the number written"""
+    if not rows:
+        return 0
+    return conn.executemany(SYNC_RECORD_SQL, _to_records(conn, rows)).rowcount
+
+def existing_veh_ids(conn, veh_ids, batch_size=500):
+    """The subset of veh_ids already present in the vehicles table"""
+    veh_ids = list(veh_ids)
+    found = set()
+    for start in range(0, len(veh_ids), batch_size):
+        batch = veh_ids[start:start + batch_size]
+        placeholders = ', '.join('?' * len(batch))
+        found.update(
+            row[0] for row in conn.execute(
+                f"SELECT VEH_ID FROM vehicle_records WHERE VEH_ID IN ({placeholders})", batch
+            )
+        )
+    return found
+
+def row_hash(values):
+    """Digest of a vehicle row given in VEHICLE_COLUMNS order"""
+    return hashlib.blake2b(repr(tuple(values)).encode(), digest_size=16).hexdigest()
+
+def stored_row_hashes(conn, veh_ids, batch_size=500):
+    """{VEH_ID: row_hash} recorded by earlier imports"""
+    veh_ids = list(veh_ids)
+    hashes = {}
+    for start in range(0, len(veh_ids), batch_size):
+        batch = veh_ids[start:start + batch_size]
+        placeholders = ', '.join('?' * len(batch))
+        hashes.update(conn.execute(
+            f"SELECT VEH_ID, row_hash FROM vehicle_row_hashes WHERE VEH_ID IN ({placeholders})", batch
+        ))
+    return hashes
+
+def store_row_hashes(conn, rows):
+    """Record the hash of freshly written rows; call after writing them"""
+    conn.executemany(
+        "INSERT OR REPLACE INTO vehicle_row_hashes (VEH_ID, row_hash) VALUES (?, ?)",
+        ((values[0], row_hash(values)) for values in rows)
+    )
+
+def _advance_sequence(conn, veh_id):
+    # Prefixes without a counter yet are seeded from the table when first
+    # used, so only existing counters need moving
+    for prefix, last_value in conn.execute("SELECT prefix, last_value FROM veh_id_sequences").fetchall():
+        number = veh_id[len(prefix):].lstrip('-') if veh_id.startswith(prefix) else ''
+        if number.isdigit() and int(number) > last_value:
+            conn.execute("UPDATE veh_id_sequences SET last_value = ? WHERE prefix = ?", (int(number), prefix))
+
+def reset_sequences(conn):
+    """Forget all counters so they are reseeded from the vehicles table"""
+    conn.execute("DELETE FROM veh_id_sequences")
+
+def data_version(conn):
+    """Counter bumped by every write to the vehicles table"""
+    return conn.execute("SELECT value FROM vms_meta WHERE key = 'data_version'").fetchone()[0]
+
+def bump_data_version(conn):
+    """Invalidate cached query results; call inside the writing transaction"""
+    conn.execute("UPDATE vms_meta SET value = value + 1 WHERE key = 'data_version'")
+
+def _actual_stats_sql():
+    # The counters vehicle_stats should hold, computed from the vehicles table
+    groups = [
+        f"SELECT '{dim}', COALESCE({dim}, ''), COUNT(*) FROM vehicles GROUP BY COALESCE({dim}, '')"
+        for dim in STATS_DIMENSIONS
+    ]
+    groups.append("SELECT 'TOTAL', '', COUNT(*) FROM vehicles HAVING COUNT(*) > 0")
+    return ' UNION ALL '.join(groups)
+
+def rebuild_stats(conn):
+    """Recompute every vehicle_stats counter from the vehicles table"""
+    conn.execute("DELETE FROM vehicle_stats")
+    conn.execute(f"INSERT INTO vehicle_stats (dimension, value, count) {_actual_stats_sql()}")
+
+def check_stats(conn):
+    """
+    Compare vehicle_stats with a full count of the vehicles table
+
+    The triggers keep the counters exact for every write made through
+    this module; a write from a connection without recursive_triggers
+    (e.g. INSERT OR REPLACE in the sqlite3 shell) can leave them off.
+
+    Returns:
+    - mismatches: list of (dimension, value, stored, actual), empty when
+      the counters are consistent
+    """
+    stored = {(dim, value): count for dim, value, count in
+              conn.execute("SELECT dimension, value, count FROM vehicle_stats")}
+    actual = {(dim, value): count for dim, value, count in conn.execute(_actual_stats_sql())}
+    return sorted(
+        (dim, value, stored.get((dim, value), 0), actual.get((dim, value), 0))
+        for dim, value in stored.keys() | actual.keys()
+        if stored.get((dim, value), 0) != actual.get((dim, value), 0)
+    )
+
+def vehicle_stats(conn, dimension):
+    """(value, count) pairs for one of STATS_DIMENSIONS, largest first"""
+    if dimension not in STATS_DIMENSIONS:
+        raise ValueError(f"Unknown statistics dimension: {dimension}")
+    return conn.execute(VEHICLE_STATS_SQL, (dimension,)).fetchall()
+
+def total_vehicles(conn):
+    """Fleet size from the maintained counters"""
+    row = conn.execute("SELECT count FROM vehicle_stats WHERE dimension = 'TOTAL'").fetchone()
+    return row[0] if row else 0
+
+def data_token(conn):
+    """Database id and data version, naming one state of this database's data"""
+    meta = dict(conn.execute("SELECT key, value FROM vms_meta WHERE key IN ('database_id', 'data_version')"))
+    return f"{meta['database_id']}.{meta['data_version']}"
+
+class QueryCache:
+    """
+    LRU of query results keyed by SQL and parameters
+    
+    An entry is only served while the data version it was loaded at is
+    still current, so writers invalidate it by calling bump_data_version.
+    Cached results are shared between sessions and must not be mutated.
+    """
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, conn, query, params, load):
+        """Return load(conn, query, params), cached until the data changes"""
+        key = (query, tuple(params))
+        version = data_version(conn)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        
+        result = load(conn, query, params)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = (version, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
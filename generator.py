@@ -0,0 +1,39 @@
+import db
+import perf
+from constants import format_veh_id
+
+# Rows per executemany call when generating vehicles
+GENERATION_CHUNK_SIZE = 5000
+
+def build_generated_rows(conn, vehicle_counts):
+    """Reserve VEH_IDs and build the rows for every requested type in memory"""
+    rules = db.vehicle_type_rules(conn)
+    rows = []
+    for vehicle_type, count in vehicle_counts.items():
+        if count <= 0:
+            continue
+        if vehicle_type not in rules:
+            raise ValueError(f"Unknown vehicle type: {vehicle_type}")
+
+        # One counter bump reserves the whole batch for this type
+        prefix, used_for = rules[vehicle_type]
+        first = db.allocate_ids(conn, prefix, count)
+
+        rows.extend(
+            (format_veh_id(prefix, number), f"{vehicle_type} REG {number}", vehicle_type,
+             "Default Make", "Default Model", 2020, "Default Owner", used_for)
+            for number in range(first, first + count)
+        )
+    return rows
+
+@perf.instrument("generate: generate_vehicles", rows=int)
+def generate_vehicles(conn, vehicle_counts, progress=None):
+    """
+    Generate vehicles for each type in vehicle_counts
+
+    conn must be inside a write transaction (see ConnectionPool.transaction).
+    Returns the number of vehicles created.
+    """
+    rows = build_generated_rows(conn, vehicle_counts)
+    db.bump_data_version(conn)
+    return db.insert_vehicles(conn, rows, chunk_size=GENERATION_CHUNK_SIZE, progress=progress)
@@ -0,0 +1,264 @@
+import csv
+import math
+
+import db
+import perf
+import snapshot
+
+REQUIRED_COLUMNS = list(db.VEHICLE_COLUMNS)
+
+# What to do with a row whose VEH_ID is already in the database
+CONFLICT_POLICIES = {
+    "skip": "Keep the existing vehicle",
+    "update": "Overwrite the existing vehicle",
+    "reject": "Reject the row and list it in the report",
+    "sync": "Update only vehicles that changed (incremental sync)",
+}
+
+DEFAULT_CHUNK_SIZE = 5000
+
+def _check_columns(columns):
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"Missing required columns in the uploaded file: {', '.join(missing)}")
+
+def read_csv_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of (line, row dict) pairs from a CSV file, chunk_size lines at a time"""
+    import pandas as pd
+    # Blank lines are kept so that they are counted, then dropped here
+    reader = pd.read_csv(
+        source, chunksize=chunk_size, dtype=str, keep_default_na=False, encoding='utf-8-sig',
+        skip_blank_lines=False
+    )
+    for frame in reader:
+        frame.columns = [str(col).strip() for col in frame.columns]
+        _check_columns(frame.columns)
+        # The header is line 1; assumes no quoted values span lines
+        yield [(line, record) for line, record in zip(frame.index + 2, frame.to_dict('records'))
+               if any(record.values())]
+
+def read_xlsx_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield lists of (sheet row, row dict) pairs from the first sheet of an Excel workbook"""
+    from openpyxl import load_workbook
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        # Read-only sheets yield every row from row 1, empty ones included
+        rows = enumerate(workbook.active.iter_rows(values_only=True), start=1)
+        header = [str(col).strip() if col is not None else '' for col in next(rows, (1, ()))[1]]
+        _check_columns(header)
+
+        chunk = []
+        for row_no, values in rows:
+            if all(value is None for value in values):
+                continue
+            chunk.append((row_no, dict(zip(header, values))))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        workbook.close()
+
+def _number_snapshot_rows(chunks):
+    # Parquet has no lines; rows are numbered as if under a header line
+    row_no = 1
+    for chunk in chunks:
+        yield [(row_no + i, record) for i, record in enumerate(chunk, start=1)]
+        row_no += len(chunk)
+
+def read_chunks(source, filename, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Pick the chunked reader for a file by its extension
+
+    Every reader yields lists of (line, row dict) pairs, where line is the
+    row's line in a CSV file or its row in the Excel sheet, so rejected
+    rows can be traced back to the file. Blank rows are skipped.
+    """
+    if filename.lower().endswith('.csv'):
+        return read_csv_chunks(source, chunk_size)
+    if filename.lower().endswith('.parquet'):
+        # Typed snapshots from snapshot.export_snapshot
+        return _number_snapshot_rows(snapshot.read_snapshot_chunks(source, chunk_size))
+    return read_xlsx_chunks(source, chunk_size)
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    value = str(value).strip()
+    return value or None
+
+def validate_row(record, vehicle_types, usage_categories):
+    """
+    Check one incoming row against the VMS rules
+
+    vehicle_types and usage_categories are the accepted names, as read
+    from the lookup tables (db.vehicle_type_names, db.usage_category_names).
+
+    Returns (values, None) with values in VEHICLE_COLUMNS order, or
+    (None, reason) when the row has to be rejected.
+    """
+    values = {col: _clean(record.get(col)) for col in REQUIRED_COLUMNS}
+
+    if not values['VEH_ID']:
+        return None, "missing VEH_ID"
+    if values['VEHICLE_TYPE'] not in vehicle_types:
+        return None, f"unknown VEHICLE_TYPE {values['VEHICLE_TYPE']!r}"
+    if values['USED_FOR'] is not None and values['USED_FOR'] not in usage_categories:
+        return None, f"unknown USED_FOR {values['USED_FOR']!r}"
+
+    year = values['YEAR']
+    if year is not None:
+        try:
+            number = float(year)
+        except ValueError:
+            return None, f"invalid YEAR {year!r}"
+        # int() fails on inf and nan, and 2020.5 is not a year
+        if not number.is_integer():
+            return None, f"invalid YEAR {year!r}"
+        year = int(number)
+        if not 1900 <= year <= 2100:
+            return None, f"YEAR {year} out of range"
+        values['YEAR'] = year
+
+    return tuple(values[col] for col in REQUIRED_COLUMNS), None
+
+def _write_chunk(conn, valid, policy, counts, reject):
+    # Earlier chunks are already committed, so this also catches VEH_IDs
+    # repeated further down the file
+    seen = db.existing_veh_ids(conn, (values[0] for _, _, values in valid))
+    new_rows, duplicates = [], []
+    for line_no, record, values in valid:
+        if values[0] in seen:
+            duplicates.append((line_no, record, values))
+        else:
+            seen.add(values[0])
+            new_rows.append(values)
+
+    db.insert_vehicles(conn, new_rows)
+    counts["inserted"] += len(new_rows)
+    written = new_rows
+
+    if policy == "update":
+        written = new_rows + [values for _, _, values in duplicates]
+        counts["updated"] += db.upsert_vehicles(conn, written[len(new_rows):])
+    elif policy == "sync":
+        # Only rows whose hash moved since the last import are candidates,
+        # and the upsert's WHERE skips any that turn out identical
+        stored = db.stored_row_hashes(conn, (values[0] for _, _, values in duplicates))
+        changed = [values for _, _, values in duplicates if stored.get(values[0]) != db.row_hash(values)]
+        updated = db.sync_vehicles(conn, changed)
+        counts["updated"] += updated
+        counts["unchanged"] += len(duplicates) - updated
+        written = new_rows + changed
+    elif policy == "skip":
+        counts["skipped"] += len(duplicates)
+    else:
+        for line_no, record, _ in duplicates:
+            reject(line_no, record, "duplicate VEH_ID")
+
+    db.store_row_hashes(conn, written)
+
+@perf.instrument("import: import_file", rows=lambda counts: counts['read'])
+def import_file(conn, source, filename, policy="skip", chunk_size=DEFAULT_CHUNK_SIZE,
+                rejects=None, progress=None, remove_missing=False):
+    """
+    Stream a CSV, Excel or Parquet snapshot file into the vehicles table
+
+    Parameters:
+    - conn: SQLite connection, not inside a transaction
+    - source: path or binary file object
+    - filename: used to tell CSV, Excel and Parquet apart
+    - policy: one of CONFLICT_POLICIES, applied to existing VEH_IDs
+    - chunk_size: rows read, validated and written per transaction
+    - rejects: optional text file; rejected rows are written to it as CSV
+      with the LINE of the row in the file (its row in an Excel sheet)
+      and the REASON
+    - progress: optional callable receiving the running counts after
+      each chunk
+    - remove_missing: with the "sync" policy, delete vehicles whose VEH_ID
+      does not appear in the file
+
+    Only one chunk is held in memory at a time, and a bad row is rejected
+    on its own instead of aborting the import. The "sync" policy compares
+    each row's hash with the one stored at the last import and rewrites
+    only the vehicles that changed.
+
+    Returns:
+    - counts: dict of rows read, inserted, updated, unchanged, skipped and
+      rejected, plus vehicles missing from the file and removed
+    """
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy: {policy}")
+
+    counts = {"read": 0, "inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0,
+              "rejected": 0, "missing": 0, "removed": 0}
+    writer = None
+    if rejects is not None:
+        writer = csv.writer(rejects)
+        writer.writerow(['LINE'] + REQUIRED_COLUMNS + ['REASON'])
+
+    def reject(line, record, reason):
+        counts["rejected"] += 1
+        if writer:
+            writer.writerow([line] + [_clean(record.get(col)) for col in REQUIRED_COLUMNS] + [reason])
+
+    if policy == "sync":
+        # Every VEH_ID in the file, to find the vehicles it no longer lists
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS sync_seen (VEH_ID TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute("DELETE FROM temp.sync_seen")
+        conn.commit()
+
+    vehicle_types = set(db.vehicle_type_names(conn))
+    usage_categories = set(db.usage_category_names(conn))
+    try:
+        for chunk in read_chunks(source, filename, chunk_size):
+            valid = []
+            for line, record in chunk:
+                values, reason = validate_row(record, vehicle_types, usage_categories)
+                if reason:
+                    reject(line, record, reason)
+                else:
+                    valid.append((line, record, values))
+            counts["read"] += len(chunk)
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                inserted, updated = counts["inserted"], counts["updated"]
+                _write_chunk(conn, valid, policy, counts, reject)
+                if policy == "sync":
+                    # Rejected rows still name a vehicle that must not be removed
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO temp.sync_seen (VEH_ID) VALUES (?)",
+                        ((veh_id,) for veh_id in (_clean(record.get('VEH_ID')) for _, record in chunk) if veh_id)
+                    )
+                if counts["inserted"] != inserted:
+                    # Imported VEH_IDs may run past the generator's counters
+                    db.reset_sequences(conn)
+                if (counts["inserted"], counts["updated"]) != (inserted, updated):
+                    db.bump_data_version(conn)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+            if progress:
+                progress(dict(counts))
+
+        if policy == "sync":
+            missing = "FROM vehicle_records WHERE VEH_ID NOT IN (SELECT VEH_ID FROM temp.sync_seen)"
+            counts["missing"] = conn.execute(f"SELECT COUNT(*) {missing}").fetchone()[0]
+            if remove_missing and counts["missing"]:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    counts["removed"] = conn.execute(f"DELETE {missing}").rowcount
+                    db.bump_data_version(conn)
+                    conn.commit()
+                except BaseException:
+                    conn.rollback()
+                    raise
+    finally:
+        if policy == "sync":
+            conn.execute("DROP TABLE IF EXISTS temp.sync_seen")
+
+    return counts
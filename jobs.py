@@ -0,0 +1,273 @@
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+
+JOBS_DIR = ".jobs"
+DEFAULT_WORKERS = 2
+
+# Progress is written at most this often per job
+PROGRESS_INTERVAL = 0.5
+
+# Finished jobs and their files are kept this long
+KEEP_SECONDS = 7 * 24 * 3600
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+JOB_COLUMNS = ('job_id', 'kind', 'title', 'params', 'status', 'progress', 'message',
+               'result', 'artifact', 'error', 'created_at', 'started_at', 'finished_at')
+
+def init_jobs(conn):
+    """Create the jobs table if it doesn't exist"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            title TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            progress REAL,
+            message TEXT,
+            result TEXT,
+            artifact TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status)")
+    conn.commit()
+
+class JobContext:
+    """What a handler gets besides its parameters: progress reporting and a file directory"""
+    def __init__(self, runner, job_id, directory):
+        self.job_id = job_id
+        self.directory = directory
+        self._runner = runner
+        self._last_progress = 0.0
+
+    def path(self, name):
+        """Path of a file in this job's directory"""
+        return os.path.join(self.directory, name)
+
+    def progress(self, fraction, message=None, force=False):
+        """Record progress (fraction 0-1, or None when the total is unknown)"""
+        now = time.monotonic()
+        if force or now - self._last_progress >= PROGRESS_INTERVAL:
+            self._last_progress = now
+            self._runner._update(self.job_id, progress=fraction, message=message)
+
+def _generate(ctx, runner, params):
+    import generator
+    vehicle_counts = params['counts']
+
+    def progress(done, total):
+        ctx.progress(done / total, f"Inserted {done:,} of {total:,} vehicles")
+
+    created = runner.pool.write(generator.generate_vehicles, vehicle_counts, progress=progress)
+    return {'created': created}, None
+
+def _import(ctx, runner, params):
+    import importer
+    size = os.path.getsize(ctx.path(params['filename']))
+
+    def progress(counts):
+        ctx.progress(None, f"Processed {counts['read']:,} rows ({size / 2**20:.1f} MB file)")
+
+    with open(ctx.path(params['filename']), 'rb') as source, \
+            open(ctx.path('rejected_rows.csv'), 'w', newline='', encoding='utf-8') as rejects:
+        with runner.pool.connection() as conn:
+            counts = importer.import_file(conn, source, params['filename'], policy=params['policy'],
+                                          rejects=rejects, progress=progress,
+                                          remove_missing=params.get('remove_missing', False))
+    return counts, 'rejected_rows.csv' if counts['rejected'] else None
+
+def _report(ctx, runner, params):
+    import pdf_reports_final
+    report_type, title = params['report_type'], params['title']
+    query = db.VEHICLE_TYPE_REPORT_SQL if report_type == "vehicle_type" else db.USAGE_REPORT_SQL
+    ctx.progress(None, "Rendering", force=True)
+    with runner.pool.connection() as conn:
+        render = lambda: pdf_reports_final.generate_vehicle_report_from_query(
+            conn, query, (title,), title, report_type
+        )
+        if runner.report_cache is None:
+            pdf_bytes = render()
+        else:
+            pdf_bytes = runner.report_cache.get_or_render(
+                report_type, title, db.data_token(conn), pdf_reports_final.TEMPLATE_VERSION, render
+            )
+    name = pdf_reports_final.report_filename(report_type)
+    with open(ctx.path(name), 'wb') as f:
+        f.write(pdf_bytes)
+    return {'bytes': len(pdf_bytes)}, name
+
+def _report_pack(ctx, runner, params):
+    import report_batch
+
+    def progress(done, total, report_title):
+        ctx.progress(done / total, f"Rendered {report_title} ({done}/{total})")
+
+    with runner.pool.connection() as conn:
+        reports = report_batch.generate_all_reports(conn, progress=progress)
+    name = report_batch.zip_filename()
+    with open(ctx.path(name), 'wb') as f:
+        f.write(report_batch.build_zip(reports))
+    return {'reports': len(reports)}, name
+
+# kind -> handler(ctx, runner, params), returning (result dict, artifact file name or None)
+HANDLERS = {
+    'generate': _generate,
+    'import': _import,
+    'report': _report,
+    'report_pack': _report_pack,
+}
+
+class JobRunner:
+    """
+    Runs long operations on a thread pool, off the Streamlit script thread
+
+    Jobs are recorded in their own SQLite database under directory, with
+    status, progress, a JSON result and an optional artifact file (a PDF,
+    ZIP or rejected rows CSV) kept in the job's own folder. Pages only
+    submit and poll, so a rerun, a widget click or a browser refresh
+    leaves the work running and the job list intact.
+
+    The job table lives apart from vehicles.db so that progress updates
+    never wait on the write lock a generation or import job is holding.
+    Jobs still queued when the server stopped are picked up again on the
+    next start; jobs that were running are marked as failed.
+    """
+    def __init__(self, pool, directory=JOBS_DIR, workers=DEFAULT_WORKERS, report_cache=None):
+        self.pool = pool
+        self.directory = directory
+        self.report_cache = report_cache
+        os.makedirs(directory, exist_ok=True)
+        self._jobs = db.ConnectionPool(os.path.join(directory, 'jobs.db'), size=workers + 2)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vms-job')
+        with self._jobs.connection() as conn:
+            init_jobs(conn)
+        self._recover()
+
+    def _recover(self):
+        with self._jobs.transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', error = 'Interrupted by a server restart', finished_at = ? "
+                "WHERE status = 'running'", (time.time(),)
+            )
+            queued = [row[0] for row in conn.execute("SELECT job_id FROM jobs WHERE status = 'queued' ORDER BY job_id")]
+        self.prune()
+        for job_id in queued:
+            self._executor.submit(self._run, job_id)
+
+    def _job_dir(self, job_id):
+        return os.path.join(self.directory, str(job_id))
+
+    def submit(self, kind, title, params, inputs=None):
+        """
+        Queue a job and return its id
+
+        Parameters:
+        - kind: one of HANDLERS
+        - title: label shown in the job list
+        - params: JSON-serializable parameters for the handler
+        - inputs: optional {file name: bytes} saved in the job's folder
+          before it starts, e.g. an uploaded file
+        """
+        if kind not in HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        with self._jobs.transaction() as conn:
+            job_id = conn.execute(
+                "INSERT INTO jobs (kind, title, params, created_at) VALUES (?, ?, ?, ?)",
+                (kind, title, json.dumps(params), time.time())
+            ).lastrowid
+        os.makedirs(self._job_dir(job_id), exist_ok=True)
+        for name, data in (inputs or {}).items():
+            with open(os.path.join(self._job_dir(job_id), name), 'wb') as f:
+                f.write(data)
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def _update(self, job_id, **fields):
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._jobs.transaction() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", list(fields.values()) + [job_id])
+
+    def _run(self, job_id):
+        with self._jobs.transaction() as conn:
+            row = conn.execute("SELECT kind, params FROM jobs WHERE job_id = ? AND status = 'queued'", (job_id,)).fetchone()
+            if row is None:
+                return
+            conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ?", (time.time(), job_id))
+        kind, params = row[0], json.loads(row[1])
+
+        os.makedirs(self._job_dir(job_id), exist_ok=True)
+        ctx = JobContext(self, job_id, self._job_dir(job_id))
+        try:
+            result, artifact = HANDLERS[kind](ctx, self, params)
+        except Exception as e:
+            self._update(job_id, status='failed', error=str(e) or type(e).__name__, finished_at=time.time())
+            return
+        self._update(job_id, status='done', progress=1.0, message=None, result=json.dumps(result),
+                     artifact=artifact, finished_at=time.time())
+
+    def get(self, job_id):
+        """The job as a dict (params and result decoded), or None"""
+        with self._jobs.connection() as conn:
+            row = conn.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def recent(self, kinds=None, limit=10):
+        """Most recent jobs first, optionally only of the given kinds"""
+        query = f"SELECT {', '.join(JOB_COLUMNS)} FROM jobs"
+        params = []
+        if kinds:
+            query += " WHERE kind IN (SELECT value FROM json_each(?))"
+            params.append(json.dumps(list(kinds)))
+        query += " ORDER BY job_id DESC LIMIT ?"
+        with self._jobs.connection() as conn:
+            return [_job_dict(row) for row in conn.execute(query, params + [limit])]
+
+    def artifact_path(self, job):
+        """Path of a finished job's artifact, or None"""
+        if not job['artifact']:
+            return None
+        path = os.path.join(self._job_dir(job['job_id']), job['artifact'])
+        return path if os.path.exists(path) else None
+
+    def prune(self, keep_seconds=KEEP_SECONDS):
+        """Forget finished jobs older than keep_seconds and delete their files"""
+        cutoff = time.time() - keep_seconds
+        with self._jobs.transaction() as conn:
+            old = [row[0] for row in conn.execute(
+                "SELECT job_id FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (cutoff,)
+            )]
+            conn.execute("DELETE FROM jobs WHERE job_id IN (SELECT value FROM json_each(?))", (json.dumps(old),))
+        for job_id in old:
+            shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        return len(old)
+
+    def wait(self, job_id, timeout=None, interval=0.1):
+        """Block until the job has finished (for scripts and tests); returns the job"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job['status'] not in ACTIVE_STATUSES:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} still {job['status']}")
+            time.sleep(interval)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+        self._jobs.close()
+
+def _job_dict(row):
+    job = dict(zip(JOB_COLUMNS, row))
+    job['params'] = json.loads(job['params'])
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
@@ -0,0 +1,27 @@
+import streamlit as st
+import generator
+from page_jobs import show_jobs
+from resources import get_job_runner, get_pool, vehicle_types
+
+def show_generation_form():
+    st.subheader("🔄 Generate Vehicles")
+    
+    with st.form("generation_form"):
+        st.write("Enter the number of vehicles to generate for each type:")
+        vehicle_counts = {}
+        
+        for v_type in vehicle_types():
+            vehicle_counts[v_type] = st.number_input(f"{v_type}", min_value=0, value=0)
+        
+        if st.form_submit_button("Generate Vehicles"):
+            vehicle_counts = {v_type: count for v_type, count in vehicle_counts.items() if count > 0}
+            if vehicle_counts:
+                total = sum(vehicle_counts.values())
+                job_id = get_job_runner().submit("generate", f"Generate {total:,} vehicles", {'counts': vehicle_counts})
+                st.success(f"Generation started in the background (job #{job_id})")
+    
+    show_jobs(kinds=("generate",))
+
+def generate_vehicles(vehicle_counts, progress=None):
+    """Generate vehicles in a single transaction, returns the number created"""
+    return get_pool().write(generator.generate_vehicles, vehicle_counts, progress=progress)
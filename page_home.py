@@ -0,0 +1,299 @@
+import io
+from datetime import datetime
+import streamlit as st
+import db
+import perf
+import snapshot
+from resources import get_pool, get_query_cache, get_writer, read_frame, read_scalar, usage_categories
+
+# Page size choices for the All Vehicles table
+PAGE_SIZES = [25, 50, 100, 250, 500]
+
+def show_home_page():
+    # Admin Panel in a smaller expander
+    with st.expander("⚙️ Admin Panel", expanded=False):
+        if st.button("Reset Database"):
+            if st.session_state.get('confirm_reset', False):
+                reset_database()
+                st.success("Database has been reset!")
+                st.session_state.confirm_reset = False
+            else:
+                st.session_state.confirm_reset = True
+                st.warning("Click again to confirm database reset!")
+        
+        if st.button("Export Snapshot"):
+            st.download_button(
+                label="Download Snapshot (Parquet)",
+                data=export_snapshot(),
+                file_name=f"vehicles_snapshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.parquet",
+                mime="application/vnd.apache.parquet"
+            )
+        
+        if st.button("Check Statistics"):
+            mismatches = check_statistics()
+            if mismatches:
+                st.warning(f"{len(mismatches)} dashboard counters were out of date and have been rebuilt")
+            else:
+                st.success("Dashboard counters match the vehicles table")
+        
+        st.markdown("**⏱️ Performance**")
+        show_performance_panel()
+    
+    # Compact header with statistics
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        total_vehicles = get_total_vehicles()
+        st.metric("Total Vehicles", total_vehicles)
+    with col2:
+        show_fleet_breakdown()
+    
+    # Search functionality
+    st.subheader("🔍 Search Vehicles")
+    search_col1, search_col2 = st.columns([3, 1])
+    with search_col1:
+        search_term = st.text_input("Search by Vehicle ID, Registration, Type, Make, Model, or Owner", placeholder="Enter search term...")
+    with search_col2:
+        search_field = st.selectbox("Search in", ["All Fields", "VEH_ID", "REG_NO", "VEHICLE_TYPE", "MAKE", "MODEL", "OWNER", "USED_FOR"])
+    
+    # Vehicle Table with Edit/Delete buttons
+    st.subheader("🚗 All Vehicles")
+    show_vehicle_table(search_term, search_field)
+
+def show_performance_panel():
+    stats = perf.RECORDER.summary()
+    if not stats:
+        st.caption("No timings recorded yet")
+        return
+    st.caption(f"Percentiles over the last {perf.RECORDER.window} calls of each operation in this server process")
+    st.dataframe(
+        stats,
+        column_config={
+            'name': "Operation",
+            'calls': st.column_config.NumberColumn("Calls"),
+            'p50_ms': st.column_config.NumberColumn("p50 ms", format="%.1f"),
+            'p95_ms': st.column_config.NumberColumn("p95 ms", format="%.1f"),
+            'max_ms': st.column_config.NumberColumn("Max ms", format="%.1f"),
+            'total_ms': st.column_config.NumberColumn("Total ms", format="%.0f"),
+            'rows': st.column_config.NumberColumn("Rows/call", format="%.0f"),
+        },
+        hide_index=True
+    )
+    name = st.selectbox("Latency histogram", [s['name'] for s in stats])
+    buckets = perf.histogram(perf.RECORDER.durations(name))
+    st.bar_chart([{'Latency': label, 'Calls': count} for label, count in buckets],
+                 x='Latency', y='Calls', sort=False, height=200)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            label="Export Timings (JSON lines)",
+            data=perf.RECORDER.export_jsonl,
+            file_name=f"vms_timings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+            mime="application/x-ndjson",
+            on_click='ignore'
+        )
+    with col2:
+        st.button("Reset Timings", on_click=perf.RECORDER.reset)
+
+def get_total_vehicles():
+    with get_pool().connection() as conn:
+        return db.total_vehicles(conn)
+
+def get_vehicle_stats(dimension):
+    with get_pool().connection() as conn:
+        return get_query_cache().get(conn, db.VEHICLE_STATS_SQL, (dimension,), read_frame)
+
+def show_fleet_breakdown():
+    # Read from the trigger-maintained counters, a few dozen rows at most
+    by_type, by_usage, by_owner = st.tabs(["By Vehicle Type", "By Usage", "By Owner"])
+    with by_type:
+        st.bar_chart(get_vehicle_stats('VEHICLE_TYPE'), x='value', y='count', x_label="Vehicle Type",
+                     y_label="Vehicles", height=250)
+    with by_usage:
+        st.bar_chart(get_vehicle_stats('USED_FOR'), x='value', y='count', x_label="Usage",
+                     y_label="Vehicles", height=250)
+    with by_owner:
+        owners = get_vehicle_stats('OWNER')
+        st.dataframe(owners.rename(columns={'value': 'Owner', 'count': 'Vehicles'}), height=250, hide_index=True)
+
+def export_snapshot():
+    """The whole vehicles table as Parquet bytes"""
+    buffer = io.BytesIO()
+    with get_pool().connection() as conn:
+        snapshot.export_snapshot(conn, buffer)
+    return buffer.getvalue()
+
+def check_statistics():
+    """Rebuild the dashboard counters if they disagree with the vehicles table"""
+    with get_pool().transaction() as conn:
+        mismatches = db.check_stats(conn)
+        if mismatches:
+            db.rebuild_stats(conn)
+            db.bump_data_version(conn)
+    return mismatches
+
+def search_vehicles(conn, search_term="", search_field="All Fields", after=None, limit=None):
+    query, params = db.search_query(search_term, search_field, after=after, limit=limit)
+    return get_query_cache().get(conn, query, params, read_frame)
+
+def _next_page(last_p_key):
+    st.session_state.page_cursors.append(last_p_key)
+
+def _previous_page():
+    st.session_state.page_cursors.pop()
+
+def show_vehicle_table(search_term="", search_field="All Fields"):
+    if 'edit_vehicle' not in st.session_state:
+        st.session_state.edit_vehicle = None
+    
+    page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+    
+    # Keyset cursors: the p_key each visited page starts after
+    table_key = (search_term, search_field, page_size)
+    if st.session_state.get('table_key') != table_key:
+        st.session_state.table_key = table_key
+        st.session_state.page_cursors = [0]
+    cursors = st.session_state.page_cursors
+    
+    with get_pool().connection() as conn:
+        total = get_query_cache().get(conn, *db.count_query(search_term, search_field), read_scalar)
+        df = search_vehicles(conn, search_term, search_field, after=cursors[-1], limit=page_size)
+    
+    # Outcome of the last bulk action, set by its callback
+    if 'bulk_result' in st.session_state:
+        st.success(st.session_state.pop('bulk_result'))
+    if 'bulk_error' in st.session_state:
+        st.error(st.session_state.pop('bulk_error'))
+    
+    if not df.empty:
+        # Display the current page; rows can be ticked for bulk actions
+        first_row = (len(cursors) - 1) * page_size + 1
+        last_row = first_row + len(df) - 1
+        # Ticked rows are kept by key as positions, so each page, search and
+        # edit gets its own key rather than carrying ticks onto other rows
+        event = st.dataframe(
+            df, on_select="rerun", selection_mode="multi-row",
+            key=f"vehicle_table_{table_key}_{cursors[-1]}_{st.session_state.get('bulk_generation', 0)}"
+        )
+        selected_ids = df['VEH_ID'].iloc[[row for row in event.selection.rows if row < len(df)]].tolist()
+        
+        nav1, nav2, nav3 = st.columns([1, 2, 1])
+        with nav1:
+            st.button("◀ Previous", on_click=_previous_page, disabled=len(cursors) == 1)
+        with nav2:
+            st.caption(f"Showing {first_row:,}–{last_row:,} of {total:,} vehicles")
+        with nav3:
+            st.button("Next ▶", on_click=_next_page, args=(int(df['p_key'].iloc[-1]),),
+                      disabled=last_row >= total)
+        
+        # Pick a vehicle by ID, looked up as the user types
+        col1, col2 = st.columns(2)
+        with col1:
+            veh_id_prefix = st.text_input("Find Vehicle ID", placeholder="Type the start of a Vehicle ID, e.g. LR-0")
+        with col2:
+            matches = []
+            if veh_id_prefix:
+                with get_pool().connection() as conn:
+                    matches = db.find_veh_ids(conn, veh_id_prefix)
+            selected_vehicle = st.selectbox(
+                "Select Vehicle",
+                matches,
+                index=None,
+                placeholder="Choose a vehicle..."
+            )
+        
+        # Add Edit/Delete functionality below the table
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("Edit Selected Vehicle"):
+                if selected_vehicle:
+                    st.session_state.edit_vehicle = selected_vehicle
+                    st.session_state.pop('edit_version', None)
+                    st.info(f"Navigate to the 'Add/Edit Vehicle' page to edit {selected_vehicle}")
+        
+        with col2:
+            st.button("Delete Selected Vehicle", on_click=_delete_selected_vehicle, args=(selected_vehicle,),
+                      disabled=not selected_vehicle)
+        
+        show_bulk_actions(selected_ids, (search_term, search_field), total)
+    else:
+        st.info("No vehicles found matching your search criteria")
+
+def reset_database():
+    with get_pool().connection() as conn:
+        db.reset_database(conn)
+
+def _delete_selected_vehicle(veh_id):
+    if delete_vehicle(veh_id):
+        _finish_bulk_action(f"Vehicle {veh_id} deleted successfully!")
+
+def show_bulk_actions(selected_ids, search, total):
+    with st.expander("🧰 Bulk Actions", expanded=bool(selected_ids)):
+        scopes = {
+            f"Rows ticked in the table ({len(selected_ids)})": {'veh_ids': selected_ids},
+            f"All {total:,} vehicles matching the search": {'search': search},
+        }
+        scope = st.radio("Apply to", list(scopes), index=0 if selected_ids else 1)
+        target = scopes[scope]
+        count = len(selected_ids) if 'veh_ids' in target else total
+        
+        action = st.radio("Action", ["Update a field", "Delete"], horizontal=True)
+        if action == "Update a field":
+            column = st.selectbox("Field", db.BULK_UPDATE_COLUMNS)
+            if column == 'USED_FOR':
+                value = st.selectbox("New value", usage_categories())
+            elif column == 'YEAR':
+                value = st.number_input("New value", min_value=1900, max_value=2100, value=2020)
+            else:
+                # An empty value clears the field
+                value = st.text_input("New value").strip() or None
+            st.button(f"Update {count:,} vehicles", on_click=_apply_bulk_update,
+                      args=(column, value, target), disabled=count == 0)
+        else:
+            confirmed = st.checkbox(f"I understand this permanently deletes {count:,} vehicles")
+            st.button(f"Delete {count:,} vehicles", on_click=_apply_bulk_delete,
+                      args=(target,), disabled=count == 0 or not confirmed)
+
+def _finish_bulk_action(message):
+    # A fresh table key drops the ticked rows, which may now point elsewhere
+    st.session_state.bulk_generation = st.session_state.get('bulk_generation', 0) + 1
+    st.session_state.page_cursors = [0]
+    st.session_state.bulk_result = message
+
+def _update_and_bump(conn, column, value, target):
+    changed = db.update_vehicles(conn, column, value, **target)
+    if changed:
+        db.bump_data_version(conn)
+    return changed
+
+def _delete_and_bump(conn, target):
+    deleted = db.delete_vehicles(conn, **target)
+    if deleted:
+        db.bump_data_version(conn)
+    return deleted
+
+def _apply_bulk_update(column, value, target):
+    try:
+        changed = get_pool().write(_update_and_bump, column, value, target)
+    except Exception as e:
+        st.session_state.bulk_error = f"Error updating vehicles: {str(e)}"
+        return
+    _finish_bulk_action(f"{column} set on {changed:,} vehicles")
+
+def _apply_bulk_delete(target):
+    try:
+        deleted = get_pool().write(_delete_and_bump, target)
+    except Exception as e:
+        st.session_state.bulk_error = f"Error deleting vehicles: {str(e)}"
+        return
+    _finish_bulk_action(f"{deleted:,} vehicles deleted")
+
+def delete_vehicle(veh_id):
+    """Delete one vehicle, returns True on success"""
+    try:
+        get_writer().write(_delete_and_bump, {'veh_ids': [veh_id]})
+        return True
+    except Exception as e:
+        st.session_state.bulk_error = f"Error deleting vehicle: {str(e)}"
+        return False
@@ -0,0 +1,46 @@
+import os
+import streamlit as st
+import importer
+from page_jobs import show_jobs
+from resources import get_job_runner
+
+def show_import_page():
+    st.subheader("📥 Import Vehicle Data")
+    uploaded_file = st.file_uploader("Choose a CSV, Excel or Parquet snapshot file", type=['csv', 'xlsx', 'parquet'])
+    
+    if uploaded_file is not None:
+        try:
+            # Only the first rows are parsed for the preview
+            preview = [record for _, record in
+                       next(importer.read_chunks(uploaded_file, uploaded_file.name, chunk_size=5), [])]
+            uploaded_file.seek(0)
+            
+            st.write("Preview of uploaded data:")
+            st.dataframe(preview)
+            
+            policy = st.selectbox(
+                "If a Vehicle ID already exists",
+                list(importer.CONFLICT_POLICIES),
+                format_func=importer.CONFLICT_POLICIES.get
+            )
+            remove_missing = False
+            if policy == "sync":
+                remove_missing = st.checkbox("Remove vehicles that are not in the file")
+            
+            if st.button("Import Data"):
+                job_id = import_vehicles(uploaded_file, policy, remove_missing=remove_missing)
+                st.success(f"Import started in the background (job #{job_id})")
+        except Exception as e:
+            st.error(f"Error importing data: {str(e)}")
+    
+    show_jobs(kinds=("import",))
+
+def import_vehicles(uploaded_file, policy="skip", remove_missing=False):
+    """Queue an import of an uploaded file, returns the job id"""
+    # The job reads its own copy, so it outlives this upload widget
+    filename = os.path.basename(uploaded_file.name)
+    return get_job_runner().submit(
+        "import", f"Import {filename}",
+        {'filename': filename, 'policy': policy, 'remove_missing': remove_missing},
+        inputs={filename: uploaded_file.getvalue()}
+    )
@@ -0,0 +1,83 @@
+import functools
+import streamlit as st
+import jobs
+from resources import get_job_runner
+
+# Seconds between refreshes of the job list while a job is queued or running
+POLL_SECONDS = 1.5
+
+STATUS_ICONS = {'queued': '⏳', 'running': '🔄', 'done': '✅', 'failed': '❌'}
+
+MIME_TYPES = {'.pdf': "application/pdf", '.zip': "application/zip", '.csv': "text/csv"}
+
+def show_jobs_page():
+    st.subheader("🗂️ Background Jobs")
+    st.caption("Generation, imports and reports run here in the background; "
+               "they keep going if you switch pages or refresh the browser.")
+    show_jobs(limit=50)
+
+def show_jobs(kinds=None, limit=5):
+    """List recent jobs of the given kinds, refreshing only this list while any is active"""
+    active = _any_active(get_job_runner().recent(kinds, limit))
+    st.fragment(_job_list, run_every=POLL_SECONDS if active else None)(kinds, limit, active)
+
+def _any_active(recent):
+    return any(job['status'] in jobs.ACTIVE_STATUSES for job in recent)
+
+def _job_list(kinds, limit, was_active):
+    recent = get_job_runner().recent(kinds, limit)
+    if not recent:
+        st.caption("No jobs yet")
+        return
+    for job in recent:
+        show_job(job)
+    if was_active and not _any_active(recent):
+        # Rerun the whole page so counters and tables show the new data
+        # (and this list stops polling)
+        st.rerun()
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _summary(job):
+    result = job['result']
+    if job['kind'] == 'generate':
+        return f"{result['created']:,} vehicles generated"
+    if job['kind'] == 'import':
+        summary = (f"{result['inserted']:,} added, {result['updated']:,} updated, {result['unchanged']:,} unchanged, "
+                   f"{result['skipped']:,} skipped, {result['rejected']:,} rejected")
+        if job['params'].get('remove_missing'):
+            summary += f"; {result['removed']:,} vehicles not in the file were removed"
+        elif result['missing']:
+            summary += f"; {result['missing']:,} vehicles in the database are not in the file"
+        return summary
+    if job['kind'] == 'report_pack':
+        return f"{result['reports']} reports"
+    return f"{result['bytes'] / 1024:,.0f} KB PDF"
+
+def show_job(job):
+    status = job['status']
+    with st.container(border=True):
+        st.markdown(f"{STATUS_ICONS[status]} **#{job['job_id']} {job['title']}** · {status}")
+        if status == 'queued':
+            st.caption("Waiting for a worker...")
+        elif status == 'running':
+            if job['progress'] is not None:
+                st.progress(job['progress'], text=job['message'])
+            else:
+                st.caption(job['message'] or "Working...")
+        elif status == 'failed':
+            st.error(job['error'])
+        else:
+            st.caption(_summary(job))
+            path = get_job_runner().artifact_path(job)
+            if path:
+                st.download_button(
+                    label=f"Download {job['artifact']}",
+                    data=functools.partial(_read_file, path),
+                    file_name=job['artifact'],
+                    mime=MIME_TYPES.get(path[path.rfind('.'):], "application/octet-stream"),
+                    key=f"job_download_{job['job_id']}",
+                    on_click='ignore'
+                )
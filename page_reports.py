@@ -0,0 +1,70 @@
+import streamlit as st
+import db
+from page_jobs import show_jobs
+from resources import (get_job_runner, get_pool, get_query_cache, get_report_cache, read_frame,
+                       usage_categories, vehicle_types)
+
+def show_reports_page():
+    st.subheader("📊 Reports")
+    
+    report_type = st.radio("Select Report Type", ["By Vehicle Type", "By Usage"])
+    
+    if report_type == "By Vehicle Type":
+        vehicle_type = st.selectbox("Select Vehicle Type", vehicle_types())
+        if st.button("Generate Report"):
+            generate_vehicle_type_report(vehicle_type)
+    else:
+        usage = st.selectbox("Select Usage Category", usage_categories())
+        if st.button("Generate Report"):
+            generate_usage_report(usage)
+
+    st.markdown("---")
+    st.write(f"Month-end pack: one report per vehicle type and usage category "
+             f"({len(vehicle_types()) + len(usage_categories())} PDFs in a ZIP)")
+    if st.button("Generate All Reports"):
+        generate_all_reports()
+
+    cache = get_report_cache()
+    st.caption(f"Report cache: {cache.hits} hits, {cache.misses} misses")
+    
+    show_jobs(kinds=("report", "report_pack"))
+
+def generate_vehicle_type_report(vehicle_type):
+    # Get data for the report
+    with get_pool().connection() as conn:
+        df = get_query_cache().get(conn, db.VEHICLE_TYPE_REPORT_SQL, (vehicle_type,), read_frame)
+    
+    if df.empty:
+        st.warning(f"No vehicles found of type: {vehicle_type}")
+        return
+    
+    # Display data in Streamlit
+    st.dataframe(df)
+    
+    # The PDF is rendered by a background job and downloaded from the job list
+    job_id = get_job_runner().submit(
+        "report", f"Vehicle type report: {vehicle_type}", {'report_type': "vehicle_type", 'title': vehicle_type}
+    )
+    st.info(f"Rendering the PDF in the background (job #{job_id})")
+
+def generate_usage_report(usage):
+    # Get data for the report
+    with get_pool().connection() as conn:
+        df = get_query_cache().get(conn, db.USAGE_REPORT_SQL, (usage,), read_frame)
+    
+    if df.empty:
+        st.warning(f"No vehicles found for usage: {usage}")
+        return
+    
+    # Display data in Streamlit
+    st.dataframe(df)
+    
+    # The PDF is rendered by a background job and downloaded from the job list
+    job_id = get_job_runner().submit(
+        "report", f"Usage report: {usage}", {'report_type': "usage", 'title': usage}
+    )
+    st.info(f"Rendering the PDF in the background (job #{job_id})")
+
+def generate_all_reports():
+    job_id = get_job_runner().submit("report_pack", "Month-end report pack", {})
+    st.info(f"Rendering all reports in the background (job #{job_id})")
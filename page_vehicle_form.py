@@ -0,0 +1,85 @@
+import streamlit as st
+import db
+from resources import get_pool, get_writer, usage_categories, vehicle_types
+
+def show_vehicle_form():
+    st.subheader("🚗 Add/Edit Vehicle")
+    
+    # Check if we're editing an existing vehicle
+    editing = False
+    vehicle_data = {}
+    
+    if st.session_state.get('edit_vehicle'):
+        veh_id_to_edit = st.session_state.edit_vehicle
+        with get_pool().connection() as conn:
+            row, version = db.read_vehicle(conn, veh_id_to_edit)
+        
+        if row is not None:
+            vehicle_data = row
+            editing = True
+            # The version the edit started from, kept across reruns so that a
+            # save by someone else in the meantime is caught on submit
+            if st.session_state.get('edit_version', (None,))[0] != veh_id_to_edit:
+                st.session_state.edit_version = (veh_id_to_edit, version)
+            st.info(f"Editing vehicle: {veh_id_to_edit}")
+    
+    types, usages = vehicle_types(), usage_categories()
+    
+    # Form for adding/editing vehicle
+    with st.form("vehicle_form"):
+        veh_id = st.text_input("Vehicle ID", value=vehicle_data.get('VEH_ID', ''), disabled=editing)
+        reg_no = st.text_input("Registration Number", value=vehicle_data.get('REG_NO', ''))
+        vehicle_type = st.selectbox("Vehicle Type", types, index=types.index(vehicle_data['VEHICLE_TYPE']) if vehicle_data.get('VEHICLE_TYPE') in types else 0)
+        make = st.text_input("Make", value=vehicle_data.get('MAKE', ''))
+        model = st.text_input("Model", value=vehicle_data.get('MODEL', ''))
+        year = st.number_input("Year", min_value=1900, max_value=2100, value=int(vehicle_data.get('YEAR') or 2020))
+        owner = st.text_input("Owner", value=vehicle_data.get('OWNER', ''))
+        used_for = st.selectbox("Usage Category", usages, index=usages.index(vehicle_data['USED_FOR']) if vehicle_data.get('USED_FOR') in usages else 0)
+        
+        submitted = st.form_submit_button("Submit")
+        if submitted:
+            if reg_no:
+                with get_pool().connection() as conn:
+                    others = [v for v in db.find_by_reg_no(conn, reg_no) if v != veh_id]
+                if others:
+                    st.warning(f"Registration {reg_no} is also assigned to {', '.join(others)}")
+            version = st.session_state.edit_version[1] if editing else None
+            if save_vehicle(veh_id, reg_no, vehicle_type, make, model, year, owner, used_for, version=version):
+                st.success("Vehicle information saved!")
+                
+                # Clear the editing state
+                if editing:
+                    st.session_state.edit_vehicle = None
+                    st.session_state.pop('edit_version', None)
+                    st.rerun()
+
+def _add(conn, values):
+    db.add_vehicle(conn, values)
+    db.bump_data_version(conn)
+
+def _update(conn, values, version):
+    db.update_vehicle(conn, values, version)
+    db.bump_data_version(conn)
+
+def save_vehicle(veh_id, reg_no, vehicle_type, make, model, year, owner, used_for, version=None):
+    """
+    Add a new vehicle, or update one opened for editing at `version`
+
+    An update is refused if someone else saved the vehicle after it was
+    opened, instead of silently overwriting their changes. Returns True
+    if the vehicle was saved.
+    """
+    values = (veh_id, reg_no, vehicle_type, make, model, year, (owner or '').strip() or None, used_for)
+    try:
+        if version is None:
+            get_writer().write(_add, values)
+        else:
+            get_writer().write(_update, values, version)
+        return True
+    except db.ConcurrentEditError as e:
+        # Start over from the current row on the next submit
+        st.session_state.pop('edit_version', None)
+        st.error(f"{e}. The form now shows the current values; make your changes again and submit.")
+    except Exception as e:
+        st.error(f"Error saving vehicle: {str(e)}")
+    return False
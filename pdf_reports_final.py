@@ -1,45 +1,48 @@
+import io
 import os
+import math
 from datetime import datetime
+from itertools import islice
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import Frame, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.platypus.doctemplate import LayoutError
+from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.pdfgen import canvas
 from reportlab.platypus.flowables import HRFlowable
+import perf
 
-class NumberedCanvas(canvas.Canvas):
-    """Canvas that adds page numbers and footers to each page"""
-    def __init__(self, *args, **kwargs):
-        canvas.Canvas.__init__(self, *args, **kwargs)
-        self._saved_page_states = []
-
-    def showPage(self):
-        self._saved_page_states.append(dict(self.__dict__))
-        self._startPage()
-
-    def save(self):
-        num_pages = len(self._saved_page_states)
-        for state in self._saved_page_states:
-            self.__dict__.update(state)
-            self.draw_page_number(num_pages)
-            canvas.Canvas.showPage(self)
-        canvas.Canvas.save(self)
-
-    def draw_page_number(self, page_count):
-        page_width = self._pagesize[0]
-        
-        # Draw company name in center
-        self.setFont("Helvetica", 9)  # Increased by 2 points
-        self.drawCentredString(
-            page_width/2, 15,
-            "Vehicle Management System | Care Services Consortium"
-        )
-        
-        # Draw page numbers aligned to the right
-        self.drawRightString(
-            page_width-36, 15,  # 0.5 inch from right edge
-            f"Page {self._pageNumber} of {page_count}"
-        )
+# Landscape page with 0.5 inch side margins and 1/3 inch top/bottom margins
+PAGE_SIZE = landscape(letter)
+MARGIN = 36
+TOP_MARGIN = 24
+BOTTOM_MARGIN = 24
+AVAILABLE_WIDTH = PAGE_SIZE[0] - (2 * MARGIN)
+
+# Bump whenever the report layout changes, so cached reports are rebuilt
+TEMPLATE_VERSION = 1
+
+LOGO_PATH = "logo.png"  # Make sure to have the logo file
+
+# Text columns are left aligned, everything else is centred
+LEFT_ALIGNED_COLUMNS = ['MAKE', 'MODEL', 'OWNER', 'USED_FOR', 'VEHICLE_TYPE']
+
+def draw_footer(canv, page_number, page_count):
+    """Draw the company name and "Page X of Y" along the bottom of the page"""
+    page_width = canv._pagesize[0]
+
+    # Draw company name in center
+    canv.setFont("Helvetica", 9)
+    canv.drawCentredString(
+        page_width/2, 15,
+        "Vehicle Management System | Care Services Consortium"
+    )
+
+    # Draw page numbers aligned to the right
+    canv.drawRightString(
+        page_width-36, 15,  # 0.5 inch from right edge
+        f"Page {page_number} of {page_count}"
+    )
 
 class RepeatedTableStyle(TableStyle):
     """TableStyle that repeats the header row on each page"""
@@ -47,55 +50,89 @@ class RepeatedTableStyle(TableStyle):
         TableStyle.__init__(self, commands, **kw)
         self.repeatRows = 1  # Repeat the first row (header)
 
-def generate_vehicle_report(df, report_title, report_type="vehicle_type"):
+def column_content_lengths(df):
     """
-    Generate a PDF report for vehicles
-    
-    Parameters:
-    - df: DataFrame containing vehicle data
-    - report_title: Title for the report (e.g., vehicle type or usage category)
-    - report_type: Type of report ('vehicle_type' or 'usage')
-    
-    Returns:
-    - pdf_file: Path to the generated PDF file
+    Longest rendered value per column, header included
+
+    The frame is converted to strings once and every column measured with
+    vectorized string lengths, instead of a separate conversion per column.
     """
-    # Create PDF file with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    pdf_file = f"{report_type}_report_{timestamp}.pdf"
-    
-    # Use landscape orientation for more width
-    page_size = landscape(letter)
-    
-    # Create document with reduced margins (half the previous size)
-    margin = 36  # 0.5 inch margin (half of previous 1 inch)
-    doc = SimpleDocTemplate(
-        pdf_file,
-        pagesize=page_size,
-        rightMargin=margin,
-        leftMargin=margin,
-        topMargin=24,    # 1/3 inch margin
-        bottomMargin=24  # 1/3 inch margin
-    )
+    # Missing values measure as NaN under pandas' string dtype; count them as empty
+    content = df.astype(str).apply(lambda col: col.str.len().max()).fillna(0) if len(df) > 0 else {}
+    max_lengths = {col: max(len(str(col)), int(content.get(col, 0))) for col in df.columns}
+    if 'SR.' in max_lengths:
+        max_lengths['SR.'] = 3  # SR. is always short
+    return max_lengths
+
+def query_content_lengths(conn, query, params, columns):
+    """
+    Row count and longest value per column of a query's result
+
+    The SQLite counterpart of column_content_lengths, computed in one
+    aggregate pass without fetching the rows.
+    """
+    lengths = ', '.join(f"MAX(LENGTH(CAST(\"{col}\" AS TEXT)))" for col in columns)
+    row = conn.execute(f"SELECT COUNT(*), {lengths} FROM ({query})", params).fetchone()
+    return row[0], {col: max(len(col), length or 0) for col, length in zip(columns, row[1:])}
+
+def column_widths(columns, max_lengths, available_width=AVAILABLE_WIDTH):
+    """Split available_width between the columns in proportion to their content"""
+    # Total characters to distribute width
+    total_chars = sum(max_lengths.get(col, 3) for col in columns)
+
+    # Calculate proportional widths
+    col_widths = []
+    for col in columns:
+        if col == 'SR.':
+            width = available_width * 0.05  # Fixed small width for SR.
+        else:
+            # Proportional width based on content length, with some minimum
+            proportion = max(0.06, max_lengths[col] / total_chars)
+            width = available_width * proportion
+        col_widths.append(width)
 
-    # Container for PDF elements
+    # Adjust widths to exactly match available_width
+    scale_factor = available_width / sum(col_widths)
+    return [w * scale_factor for w in col_widths]
+
+def table_style(columns):
+    """Style commands shared by every page's table"""
+    return [
+        # Header style
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 4),  # Header padding
+        ('TOPPADDING', (0, 0), (-1, 0), 4),  # Header padding
+        # Content styling
+        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 2),  # Minimal padding
+        ('TOPPADDING', (0, 1), (-1, -1), 2),  # Minimal padding
+        ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # Center align SR. column
+        ('ALIGN', (1, 0), (-1, 0), 'CENTER'),  # Center align headers
+        # Different alignment based on column content
+        *[('ALIGN', (i, 1), (i, -1), 'LEFT' if columns[i] in LEFT_ALIGNED_COLUMNS else 'CENTER')
+          for i in range(1, len(columns))],
+        # Grid with light grey borders
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),  # Thinner grid lines
+    ]
+
+def heading_flowables(report_title, total_vehicles):
+    """Title with logo, timestamp, vehicle count and divider for the first page"""
     elements = []
 
     # Add logo and title in a table - with full width
-    logo_path = "logo.png"  # Make sure to have the logo file
-    
-    # Calculate available width (page width minus margins)
-    available_width = page_size[0] - (2 * margin)
-    
     title_data = [[
         Paragraph(
-            f'<font name="Helvetica-Bold" size="18" color="darkgreen">{report_title} Vehicles Report</font>',  # Increased by 2 points
+            f'<font name="Helvetica-Bold" size="18" color="darkgreen">{report_title} Vehicles Report</font>',
             getSampleStyleSheet()['Normal']
         ),
-        Image(logo_path, width=60, height=24) if os.path.exists(logo_path) else ''
+        Image(LOGO_PATH, width=60, height=24) if os.path.exists(LOGO_PATH) else ''
     ]]
-    
-    # Use full available width for title table
-    title_table = Table(title_data, colWidths=[available_width * 0.85, available_width * 0.15])
+    title_table = Table(title_data, colWidths=[AVAILABLE_WIDTH * 0.85, AVAILABLE_WIDTH * 0.15])
     title_table.setStyle(TableStyle([
         ('ALIGN', (0, 0), (0, 0), 'LEFT'),
         ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
@@ -107,115 +144,212 @@ def generate_vehicle_report(df, report_title, report_type="vehicle_type"):
     # Add timestamp in grey
     timestamp_text = f'Generated on: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}'
     elements.append(Paragraph(
-        f'<font name="Helvetica" size="9" color="grey">{timestamp_text}</font>',  # Increased by 2 points
+        f'<font name="Helvetica" size="9" color="grey">{timestamp_text}</font>',
         getSampleStyleSheet()['Normal']
     ))
     elements.append(Spacer(1, 2))  # Minimal spacing
 
     # Add total count - aligned left
-    total_vehicles = len(df)
     elements.append(Paragraph(
-        f'<font name="Helvetica-Bold" size="12">Total Vehicles: {total_vehicles}</font>',  # Increased by 2 points
+        f'<font name="Helvetica-Bold" size="12">Total Vehicles: {total_vehicles}</font>',
         getSampleStyleSheet()['Normal']
     ))
     elements.append(Spacer(1, 2))  # Minimal spacing
 
     # Add green horizontal divider - full width
     elements.append(HRFlowable(
-        width=available_width,  # Explicitly set to available width
+        width=AVAILABLE_WIDTH,
         thickness=1,
         color=colors.darkgreen,
         spaceBefore=1,
         spaceAfter=5  # Minimal spacing
     ))
+    return elements
+
+def _cell(value):
+    # Keep every row one line high so page capacity can be computed upfront
+    if value is None or value != value:  # None or NaN
+        return ''
+    return str(value).replace('\n', ' ')
+
+def render_report(output, report_title, columns, rows, row_count, max_lengths):
+    """
+    Draw a vehicle report one page at a time
+
+    Parameters:
+    - output: file path or binary file object
+    - report_title: Title for the report
+    - columns: column names of the rows, without SR.
+    - rows: iterable of row sequences, consumed lazily page by page
+    - row_count: number of rows the iterable will yield
+    - max_lengths: longest value per column, for the column widths
+
+    Every row is one line of a fixed height, so the rows that fit on a page
+    and the total page count are known before anything is drawn. Each page
+    gets its own table of at most that many rows, so only one page of rows
+    is held at a time and "Page X of Y" is drawn as the page is finished
+    instead of replaying saved canvas states at the end.
+    """
+    with perf.timed("report: render", rows=row_count):
+        _render_pages(output, report_title, columns, rows, row_count, max_lengths)
+
+def _render_pages(output, report_title, columns, rows, row_count, max_lengths):
+    columns = ['SR.'] + list(columns)
+    max_lengths = dict(max_lengths, **{'SR.': 3})
+    col_widths = column_widths(columns, max_lengths)
+    style = TableStyle(table_style(columns))
+
+    canv = canvas.Canvas(output, pagesize=PAGE_SIZE, pageCompression=1)
+
+    def new_frame():
+        return Frame(MARGIN, BOTTOM_MARGIN, PAGE_SIZE[0] - 2 * MARGIN,
+                     PAGE_SIZE[1] - TOP_MARGIN - BOTTOM_MARGIN)
+
+    def space_left(frame):
+        return frame._y - frame._y1p
+
+    # Measure the header and a data row once
+    sample = Table([columns, ['0'] * len(columns)], colWidths=col_widths)
+    sample.setStyle(style)
+    sample.wrap(AVAILABLE_WIDTH, PAGE_SIZE[1])
+    header_height, row_height = sample._rowHeights
+
+    def rows_fitting(height):
+        return max(1, int((height - header_height) / row_height + 1e-9))
 
-    # Create table with enhanced styling and calculate column widths
-    if not df.empty:
-        # Remove p_key column if it exists
-        if 'p_key' in df.columns:
-            df = df.drop(columns=['p_key'])
-        
-        # Add SR. column (serial number)
-        df.insert(0, 'SR.', range(1, len(df) + 1))
-        
-        # Calculate appropriate column widths based on content and actual content length
-        col_widths = []
-        
-        # Get max content length for each column to determine width
-        max_lengths = {}
-        for col in df.columns:
-            if col == 'SR.':
-                max_lengths[col] = 3  # SR. is always short
-            else:
-                # Convert all values to string and get the max length
-                max_lengths[col] = max(
-                    len(str(col)),  # Header length
-                    df[col].astype(str).str.len().max() if len(df) > 0 else 0  # Max content length
-                )
-        
-        # Total characters to distribute width
-        total_chars = sum(max_lengths.values())
-        
-        # Calculate proportional widths - ensuring they sum to available_width
-        total_width = 0
-        for col in df.columns:
-            if col == 'SR.':
-                width = available_width * 0.05  # Fixed small width for SR.
-            else:
-                # Proportional width based on content length, with some minimum
-                proportion = max(0.06, max_lengths[col] / total_chars)
-                width = available_width * proportion
-            
-            col_widths.append(width)
-            total_width += width
-        
-        # Adjust widths to exactly match available_width
-        if total_width != available_width:
-            scale_factor = available_width / total_width
-            col_widths = [w * scale_factor for w in col_widths]
-        
-        # Create table with calculated widths - ensuring it's exactly available_width
-        table_data = [df.columns.tolist()] + df.values.tolist()
-        
-        # Create table with repeating header
-        table = Table(table_data, colWidths=col_widths, repeatRows=1)  # repeatRows=1 makes header repeat
-        
-        # Apply table styling
-        table_style = [
-            # Header style
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkgreen),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),  # Increased by 2 points
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 4),  # Header padding
-            ('TOPPADDING', (0, 0), (-1, 0), 4),  # Header padding
-            # Content styling
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),  # Increased by 2 points
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 2),  # Minimal padding
-            ('TOPPADDING', (0, 1), (-1, -1), 2),  # Minimal padding
-            ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # Center align SR. column
-            ('ALIGN', (1, 0), (-1, 0), 'CENTER'),  # Center align headers
-            # Different alignment based on column content
-            *[('ALIGN', (i, 1), (i, -1), 'LEFT' if df.columns[i] in ['MAKE', 'MODEL', 'OWNER', 'USED_FOR', 'VEHICLE_TYPE'] else 'CENTER') 
-              for i in range(1, len(df.columns))],
-            # Grid with light grey borders
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),  # Thinner grid lines
-            # Alternating row colors
-            *[('BACKGROUND', (0, i), (-1, i), colors.lightgrey if i % 2 == 0 else colors.white) 
-              for i in range(1, len(table_data))]
-        ]
-        
-        table.setStyle(TableStyle(table_style))
-        elements.append(table)
+    # The first page carries the heading, the rest are all table
+    frame = new_frame()
+    frame.addFromList(heading_flowables(report_title, row_count), canv)
+    first_page_rows = rows_fitting(space_left(frame))
+    page_rows = rows_fitting(space_left(new_frame()))
+    if row_count <= first_page_rows:
+        page_count = 1
     else:
-        elements.append(Paragraph(
-            f'<font name="Helvetica-Italic" size="10">No vehicles found for this report.</font>',  # Increased by 2 points
+        page_count = 1 + math.ceil((row_count - first_page_rows) / page_rows)
+
+    if row_count == 0:
+        frame.add(Paragraph(
+            '<font name="Helvetica-Oblique" size="10">No vehicles found for this report.</font>',
             getSampleStyleSheet()['Normal']
-        ))
-    
-    # Build PDF with page numbers and footer
-    doc.build(elements, canvasmaker=NumberedCanvas)
-    
-    return pdf_file
+        ), canv)
+        draw_footer(canv, 1, 1)
+        canv.showPage()
+        canv.save()
+        return
+
+    rows = iter(rows)
+    serial = 1
+    for page_number in range(1, page_count + 1):
+        if page_number > 1:
+            frame = new_frame()
+        chunk = list(islice(rows, first_page_rows if page_number == 1 else page_rows))
+
+        table = Table(
+            [columns] + [[serial + i] + [_cell(v) for v in row] for i, row in enumerate(chunk)],
+            colWidths=col_widths
+        )
+        table.setStyle(style)
+        # Alternating row colors, continuing the pattern from the previous page
+        shading = [colors.white, colors.lightgrey] if serial % 2 else [colors.lightgrey, colors.white]
+        table.setStyle(TableStyle([('ROWBACKGROUNDS', (0, 1), (-1, -1), shading)]))
+        if not frame.add(table, canv):
+            raise LayoutError(f"Report table does not fit on page {page_number}")
+        serial += len(chunk)
+
+        draw_footer(canv, page_number, page_count)
+        canv.showPage()
+    canv.save()
+
+def report_filename(report_type):
+    """Download name for a report, stamped with the current time"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{report_type}_report_{timestamp}.pdf"
+
+def _finish(buffer, output):
+    # Optionally copy the rendered report to a path or binary file object
+    pdf_bytes = buffer.getvalue()
+    if output is None:
+        return pdf_bytes
+    if hasattr(output, 'write'):
+        output.write(pdf_bytes)
+    else:
+        with open(output, 'wb') as f:
+            f.write(pdf_bytes)
+    return pdf_bytes
+
+def generate_vehicle_report(df, report_title, report_type="vehicle_type", output=None):
+    """
+    Generate a PDF report for vehicles
+
+    Parameters:
+    - df: DataFrame containing vehicle data
+    - report_title: Title for the report (e.g., vehicle type or usage category)
+    - report_type: Type of report ('vehicle_type' or 'usage')
+    - output: optional file path or binary file object to also write the PDF to
+
+    Returns:
+    - pdf_bytes: The rendered PDF
+    """
+    # Remove p_key column if it exists
+    if 'p_key' in df.columns:
+        df = df.drop(columns=['p_key'])
+
+    buffer = io.BytesIO()
+    render_report(
+        buffer, report_title, df.columns.tolist(),
+        df.itertuples(index=False, name=None), len(df), column_content_lengths(df)
+    )
+    return _finish(buffer, output)
+
+def generate_vehicle_report_from_rows(columns, rows, report_title, report_type="vehicle_type",
+                                      output=None):
+    """
+    Generate a PDF report from plain row tuples, without pandas
+
+    Parameters:
+    - columns: column names of the rows
+    - rows: list of row sequences
+    - report_title: Title for the report
+    - report_type: Type of report ('vehicle_type' or 'usage')
+    - output: optional file path or binary file object to also write the PDF to
+
+    Returns:
+    - pdf_bytes: The rendered PDF
+    """
+    keep = [i for i, name in enumerate(columns) if name != 'p_key']
+    columns = [columns[i] for i in keep]
+    rows = [tuple(row[i] for i in keep) for row in rows]
+
+    max_lengths = {col: len(col) for col in columns}
+    for row in rows:
+        for col, value in zip(columns, row):
+            length = len(_cell(value))
+            if length > max_lengths[col]:
+                max_lengths[col] = length
+
+    buffer = io.BytesIO()
+    render_report(buffer, report_title, columns, rows, len(rows), max_lengths)
+    return _finish(buffer, output)
+
+def generate_vehicle_report_from_query(conn, query, params, report_title, report_type="vehicle_type",
+                                       output=None):
+    """
+    Generate a PDF report straight from a SQLite query
+
+    Rows are streamed from the cursor page by page, so only the finished
+    PDF grows with the number of vehicles the query returns.
+
+    Returns:
+    - pdf_bytes: The rendered PDF
+    """
+    cursor = conn.execute(query, params)
+    names = [d[0] for d in cursor.description]
+    keep = [i for i, name in enumerate(names) if name != 'p_key']
+    columns = [names[i] for i in keep]
+
+    row_count, max_lengths = query_content_lengths(conn, query, params, columns)
+    rows = (tuple(row[i] for i in keep) for row in cursor)
+
+    buffer = io.BytesIO()
+    render_report(buffer, report_title, columns, rows, row_count, max_lengths)
+    return _finish(buffer, output)
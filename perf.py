@@ -0,0 +1,158 @@
+import functools
+import json
+import math
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Samples kept per operation for the rolling percentiles
+DEFAULT_WINDOW = 500
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+class Sample:
+    """One timed call; set rows inside the timed block if the count is only known there"""
+    __slots__ = ('name', 'started', 'ms', 'rows')
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.started = time.time()
+        self.ms = None
+        self.rows = rows
+
+def _percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+class PerfRecorder:
+    """
+    In-memory timings of named operations, shared by every session of the process
+
+    Each operation keeps its last `window` samples, so the percentiles
+    follow recent behaviour, plus running totals since the last reset.
+    Recording is a perf_counter pair and a deque append under a lock, so
+    it is cheap enough to leave on in production.
+    """
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, sample):
+        with self._lock:
+            samples = self._samples.get(sample.name)
+            if samples is None:
+                samples = self._samples[sample.name] = deque(maxlen=self.window)
+                self._totals[sample.name] = [0, 0.0]
+            samples.append(sample)
+            totals = self._totals[sample.name]
+            totals[0] += 1
+            totals[1] += sample.ms
+
+    @contextmanager
+    def timed(self, name, rows=None):
+        """Time the block as one call of name; yields the Sample"""
+        sample = Sample(name, rows)
+        start = time.perf_counter()
+        try:
+            yield sample
+        finally:
+            sample.ms = (time.perf_counter() - start) * 1000
+            self.record(sample)
+
+    def instrument(self, name=None, rows=None):
+        """
+        Decorator timing every call of a function
+
+        Parameters:
+        - name: operation name, the function's qualified name by default
+        - rows: optional callable deriving a row count from the return value
+        """
+        def decorator(func):
+            label = name or f"{func.__module__}.{func.__qualname__}"
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timed(label) as sample:
+                    result = func(*args, **kwargs)
+                    if rows is not None:
+                        sample.rows = rows(result)
+                    return result
+            return wrapper
+        return decorator
+
+    def summary(self):
+        """
+        One dict per operation, slowest p95 first
+
+        Keys: name, calls (since reset), p50_ms, p95_ms and max_ms over the
+        rolling window, total_ms (since reset) and rows (mean per call over
+        the window, None when the operation reports no rows).
+        """
+        with self._lock:
+            snapshot = {name: (list(samples), tuple(self._totals[name])) for name, samples in self._samples.items()}
+        stats = []
+        for name, (samples, (calls, total_ms)) in snapshot.items():
+            durations = sorted(sample.ms for sample in samples)
+            rows = [sample.rows for sample in samples if sample.rows is not None]
+            stats.append({
+                'name': name,
+                'calls': calls,
+                'p50_ms': _percentile(durations, 0.50),
+                'p95_ms': _percentile(durations, 0.95),
+                'max_ms': durations[-1],
+                'total_ms': total_ms,
+                'rows': sum(rows) / len(rows) if rows else None,
+            })
+        return sorted(stats, key=lambda s: s['p95_ms'], reverse=True)
+
+    def durations(self, name):
+        """Millisecond durations in the rolling window of one operation"""
+        with self._lock:
+            return [sample.ms for sample in self._samples.get(name, ())]
+
+    def export_jsonl(self, output=None):
+        """
+        Every sample in the rolling windows as JSON lines, oldest first
+
+        Writes to output (a text file object) if given, otherwise returns
+        the lines as one string.
+        """
+        with self._lock:
+            samples = sorted((s for window in self._samples.values() for s in window), key=lambda s: s.started)
+        lines = (json.dumps({'ts': round(s.started, 6), 'name': s.name, 'ms': round(s.ms, 3), 'rows': s.rows}) + '\n'
+                 for s in samples)
+        if output is None:
+            return ''.join(lines)
+        output.writelines(lines)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+# Process-wide recorder used by the decorators below
+RECORDER = PerfRecorder()
+
+timed = RECORDER.timed
+instrument = RECORDER.instrument
+
+def histogram(durations, bounds=HISTOGRAM_BOUNDS_MS):
+    """(bucket label, count) pairs, from the first to the last non-empty bucket"""
+    counts = [0] * (len(bounds) + 1)
+    for ms in durations:
+        counts[next((i for i, bound in enumerate(bounds) if ms <= bound), len(bounds))] += 1
+    labels = [f"≤ {bound:,} ms" for bound in bounds] + [f"> {bounds[-1]:,} ms"]
+    used = [i for i, count in enumerate(counts) if count]
+    if not used:
+        return []
+    return list(zip(labels, counts))[used[0]:used[-1] + 1]
+
+def query_name(query):
+    """Operation name of a SQL query: its text on one line, shortened"""
+    text = re.sub(r'\s+', ' ', query).strip()
+    return f"sql: {text[:97]}..." if len(text) > 100 else f"sql: {text}"
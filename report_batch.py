@@ -0,0 +1,136 @@
+import argparse
+import io
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import db
+import perf
+
+SNAPSHOT_SQL = "SELECT * FROM vehicles ORDER BY p_key"
+
+def report_jobs(conn):
+    """(report_type, report_title) for every report in the month-end pack"""
+    return ([("vehicle_type", vehicle_type) for vehicle_type in db.vehicle_type_names(conn)]
+            + [("usage", usage) for usage in db.usage_category_names(conn)])
+
+def archive_name(report_type, report_title):
+    """File name of a report inside the ZIP"""
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', report_title).strip('_')
+    return f"{report_type}/{slug}.pdf"
+
+def read_snapshot(conn):
+    """
+    Read the whole vehicles table once and split it per report
+
+    A single SELECT sees one consistent state of the table, so every
+    report in the pack is built from the same data.
+
+    Returns:
+    - columns: column names of the rows
+    - rows_by_report: dict of (report_type, report_title) -> list of rows
+    """
+    cursor = conn.execute(SNAPSHOT_SQL)
+    columns = [d[0] for d in cursor.description]
+    type_index, usage_index = columns.index('VEHICLE_TYPE'), columns.index('USED_FOR')
+
+    rows_by_report = {job: [] for job in report_jobs(conn)}
+    for row in cursor:
+        by_type = rows_by_report.get(("vehicle_type", row[type_index]))
+        if by_type is not None:
+            by_type.append(row)
+        by_usage = rows_by_report.get(("usage", row[usage_index]))
+        if by_usage is not None:
+            by_usage.append(row)
+    return columns, rows_by_report
+
+def _render(report_type, report_title, columns, rows):
+    # Runs in a worker process; only the report module is imported there
+    from pdf_reports_final import generate_vehicle_report_from_rows
+    return generate_vehicle_report_from_rows(columns, rows, report_title, report_type)
+
+def _process_context():
+    # Background jobs call generate_all_reports from a worker thread, and a
+    # child forked from a threaded process can inherit a lock some other
+    # thread was holding. Workers forked from a clean forkserver can't.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context()
+
+@perf.instrument("report: generate_all_reports", rows=len)
+def generate_all_reports(conn, workers=None, progress=None):
+    """
+    Render every vehicle type and usage report across a process pool
+
+    Parameters:
+    - conn: SQLite connection to read the snapshot from
+    - workers: number of worker processes, all cores by default
+    - progress: optional callable receiving (done, total, report_title)
+      as each report finishes
+
+    ReportLab layout is CPU bound and single threaded, so each report is
+    rendered in its own process. The largest reports are submitted first
+    to keep the workers evenly loaded.
+
+    Returns:
+    - reports: dict of archive_name -> PDF bytes, in report_jobs order
+    """
+    columns, rows_by_report = read_snapshot(conn)
+    jobs = sorted(rows_by_report, key=lambda job: len(rows_by_report[job]), reverse=True)
+    workers = workers or os.cpu_count() or 1
+
+    rendered = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=_process_context()) as executor:
+        futures = {
+            executor.submit(_render, report_type, report_title, columns, rows_by_report[(report_type, report_title)]):
+                (report_type, report_title)
+            for report_type, report_title in jobs
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            job = futures[future]
+            rendered[job] = future.result()
+            if progress:
+                progress(done, len(futures), job[1])
+
+    return {archive_name(*job): rendered[job] for job in rows_by_report}
+
+def build_zip(reports):
+    """ZIP archive bytes holding each report under its archive name"""
+    buffer = io.BytesIO()
+    # PDF streams are already compressed
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for name, pdf_bytes in reports.items():
+            archive.writestr(name, pdf_bytes)
+    return buffer.getvalue()
+
+def zip_filename():
+    """Download name for the report pack, stamped with the current time"""
+    return f"vms_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every vehicle type and usage report into a ZIP")
+    parser.add_argument('--db', default=db.DB_PATH, help="SQLite database (default: %(default)s)")
+    parser.add_argument('--output', default=None, help="ZIP file to write (default: timestamped name)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    pool = db.ConnectionPool(args.db, size=1)
+    try:
+        with pool.connection() as conn:
+            reports = generate_all_reports(
+                conn, args.workers,
+                progress=lambda done, total, title: print(f"[{done}/{total}] {title}")
+            )
+    finally:
+        pool.close()
+
+    output = args.output or zip_filename()
+    with open(output, 'wb') as f:
+        f.write(build_zip(reports))
+    print(f"Wrote {len(reports)} reports to {output}")
+
+if __name__ == '__main__':
+    main()
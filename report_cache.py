@@ -0,0 +1,110 @@
+import hashlib
+import os
+import tempfile
+import threading
+
+REPORT_CACHE_DIR = ".report_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB of rendered PDFs
+
+class ReportCache:
+    """
+    Size-bounded on-disk LRU of rendered PDF reports
+
+    Entries are content addressed: the file name is a hash of the report
+    type, title, template version and the db.data_token the report was
+    built from, so a changed fleet or layout simply misses and old entries
+    age out. A hit refreshes the file's mtime, and the least recently used
+    files are evicted once the directory grows past max_bytes.
+    """
+    def __init__(self, directory=REPORT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(report_type, report_title, data_token, template_version):
+        parts = (str(report_type), str(report_title), str(data_token), str(template_version))
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key):
+        """Cached bytes for key, or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key, data):
+        """Store data under key, then evict down to max_bytes"""
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial PDF
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pdf'):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def get_or_render(self, report_type, report_title, data_token, template_version, render):
+        """
+        Cached PDF bytes for the report, rendering and storing them on a miss
+
+        Parameters:
+        - report_type, report_title: identify the report
+        - data_token: db.data_token read before the report's rows
+        - template_version: bumped whenever the report layout changes
+        - render: callable returning the PDF bytes
+
+        Returns:
+        - pdf_bytes: The rendered PDF
+        """
+        key = self.key(report_type, report_title, data_token, template_version)
+        data = self.get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pdf'):
+                os.unlink(entry.path)
+        with self._lock:
+            self.hits = self.misses = 0
@@ -0,0 +1,68 @@
+import streamlit as st
+import db
+import jobs
+import perf
+import report_cache
+import writer
+
+# Shared connection pool, created once per server process
+@st.cache_resource
+def get_pool():
+    return db.ConnectionPool(db.DB_PATH)
+
+@st.cache_resource
+def get_query_cache():
+    return db.QueryCache()
+
+@st.cache_resource
+def get_report_cache():
+    return report_cache.ReportCache()
+
+# Form saves and single deletes from every session, committed in batches
+@st.cache_resource
+def get_writer():
+    return writer.BatchWriter(get_pool())
+
+# Background jobs outlive the script run, and the session, that submitted them
+@st.cache_resource
+def get_job_runner():
+    return jobs.JobRunner(get_pool(), report_cache=get_report_cache())
+
+def read_frame(conn, query, params=()):
+    # pandas is only loaded by the pages that show tables
+    import pandas as pd
+    # The query and the DataFrame build are timed separately
+    with perf.timed(perf.query_name(query)) as sample:
+        cursor = conn.execute(query, params)
+        rows = cursor.fetchall()
+        sample.rows = len(rows)
+    with perf.timed("pandas: build DataFrame", rows=len(rows)):
+        df = pd.DataFrame.from_records(rows, columns=[d[0] for d in cursor.description])
+        # A few distinct values repeated on every row; categoricals store them once
+        categorical = [col for col in db.CATEGORICAL_COLUMNS if col in df.columns]
+        if categorical:
+            df = df.astype({col: 'category' for col in categorical})
+    return df
+
+def read_scalar(conn, query, params=()):
+    with perf.timed(perf.query_name(query), rows=1):
+        return conn.execute(query, params).fetchone()[0]
+
+def read_names(conn, query, params=()):
+    return [row[0] for row in conn.execute(query, params)]
+
+def vehicle_types():
+    """Vehicle type names from the lookup table, cached like other queries"""
+    with get_pool().connection() as conn:
+        return get_query_cache().get(conn, db.VEHICLE_TYPE_NAMES_SQL, (), read_names)
+
+def usage_categories():
+    """Usage category names from the lookup table"""
+    with get_pool().connection() as conn:
+        return get_query_cache().get(conn, db.USAGE_CATEGORY_NAMES_SQL, (), read_names)
+
+# Initialize database, once per server process
+@st.cache_resource
+def init_db():
+    with get_pool().connection() as conn:
+        db.init_schema(conn)
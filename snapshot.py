@@ -0,0 +1,81 @@
+import db
+import perf
+
+# Rows per Parquet row group; also the number of rows held in memory while
+# exporting or importing
+DEFAULT_ROW_GROUP_SIZE = 50_000
+
+SNAPSHOT_FORMAT_VERSION = "1"
+
+def snapshot_schema():
+    """
+    Arrow schema of a vehicles snapshot
+
+    VEHICLE_TYPE, USED_FOR and OWNER repeat across the fleet and are
+    dictionary encoded; YEAR stays an integer, with nulls for blanks.
+    """
+    import pyarrow as pa
+    categorical = pa.dictionary(pa.int32(), pa.string())
+    types = {
+        'VEH_ID': pa.string(),
+        'REG_NO': pa.string(),
+        'VEHICLE_TYPE': categorical,
+        'MAKE': pa.string(),
+        'MODEL': pa.string(),
+        'YEAR': pa.int16(),
+        'OWNER': categorical,
+        'USED_FOR': categorical,
+    }
+    return pa.schema(
+        [pa.field(col, types[col], nullable=col != 'VEH_ID') for col in db.VEHICLE_COLUMNS],
+        metadata={'vms_snapshot_version': SNAPSHOT_FORMAT_VERSION}
+    )
+
+@perf.instrument("snapshot: export_snapshot", rows=int)
+def export_snapshot(conn, sink, row_group_size=DEFAULT_ROW_GROUP_SIZE, compression='zstd'):
+    """
+    Stream the vehicles table into a Parquet file
+
+    Parameters:
+    - conn: SQLite connection
+    - sink: path or binary file object
+    - row_group_size: rows fetched and written per row group
+    - compression: Parquet codec for the column chunks
+
+    Rows are written in p_key order, one row group at a time, so memory
+    stays bounded by row_group_size whatever the fleet size.
+
+    Returns:
+    - rows: number of vehicles written
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = snapshot_schema()
+    columns = ', '.join(db.VEHICLE_COLUMNS)
+    cursor = conn.execute(f"SELECT {columns} FROM vehicles ORDER BY p_key")
+    rows = 0
+    with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+        while True:
+            chunk = cursor.fetchmany(row_group_size)
+            if not chunk:
+                break
+            arrays = [
+                pa.array([row[i] for row in chunk], type=field.type.value_type).dictionary_encode()
+                if pa.types.is_dictionary(field.type)
+                else pa.array([row[i] for row in chunk], type=field.type)
+                for i, field in enumerate(schema)
+            ]
+            writer.write_batch(pa.record_batch(arrays, schema=schema), row_group_size=row_group_size)
+            rows += len(chunk)
+    return rows
+
+def read_snapshot_chunks(source, chunk_size=DEFAULT_ROW_GROUP_SIZE):
+    """Yield lists of row dicts from a Parquet snapshot, chunk_size rows at a time"""
+    import pyarrow.parquet as pq
+    parquet_file = pq.ParquetFile(source)
+    missing = [col for col in db.VEHICLE_COLUMNS if col not in parquet_file.schema_arrow.names]
+    if missing:
+        raise ValueError(f"Missing required columns in the snapshot: {', '.join(missing)}")
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=list(db.VEHICLE_COLUMNS)):
+        yield batch.to_pylist()
@@ -0,0 +1,181 @@
+import argparse
+import sys
+
+import db
+import generator
+import importer
+import snapshot
+
+# Headless entry point for scripted and scheduled jobs. Streamlit is never
+# imported, and pandas/ReportLab only by the subcommands that need them:
+#
+#   python vms.py import fleet.csv --policy sync
+#   python vms.py export snapshot.parquet
+#   python vms.py generate "Loader Rickshaw=100" "Compactor=5"
+#   python vms.py report vehicle-type "Compactor" -o compactor.pdf
+#   python vms.py report all -o month_end.zip
+#   python vms.py stats
+#   python vms.py reset --yes
+
+def cmd_import(conn, args):
+    rejects = open(args.rejects, 'w', newline='', encoding='utf-8') if args.rejects else None
+    try:
+        with open(args.file, 'rb') as source:
+            counts = importer.import_file(
+                conn, source, args.file, policy=args.policy, chunk_size=args.chunk_size,
+                rejects=rejects, remove_missing=args.remove_missing,
+                progress=None if args.quiet else lambda c: print(f"{c['read']} rows read", file=sys.stderr)
+            )
+    finally:
+        if rejects:
+            rejects.close()
+    print(', '.join(f"{key}={value}" for key, value in counts.items()))
+
+def _parse_counts(specs, vehicle_types):
+    counts = {}
+    for spec in specs:
+        vehicle_type, sep, count = spec.rpartition('=')
+        if not sep or vehicle_type not in vehicle_types or not count.isdigit():
+            raise ValueError(f"Expected TYPE=COUNT with a known vehicle type, got {spec!r}")
+        counts[vehicle_type] = counts.get(vehicle_type, 0) + int(count)
+    return counts
+
+def cmd_generate(conn, args):
+    vehicle_counts = _parse_counts(args.counts, db.vehicle_type_names(conn))
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        created = generator.generate_vehicles(conn, vehicle_counts)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    print(f"Generated {created} vehicles")
+
+def cmd_report(conn, args):
+    if args.kind == 'all':
+        import report_batch
+        reports = report_batch.generate_all_reports(conn, args.workers)
+        output = args.output or report_batch.zip_filename()
+        with open(output, 'wb') as f:
+            f.write(report_batch.build_zip(reports))
+        print(f"Wrote {len(reports)} reports to {output}")
+        return
+
+    import pdf_reports_final
+    import report_cache
+    if args.kind == 'vehicle-type':
+        report_type, query, choices = "vehicle_type", db.VEHICLE_TYPE_REPORT_SQL, db.vehicle_type_names(conn)
+    else:
+        report_type, query, choices = "usage", db.USAGE_REPORT_SQL, db.usage_category_names(conn)
+    if args.title not in choices:
+        raise ValueError(f"Unknown {args.kind} {args.title!r}; expected one of: {', '.join(choices)}")
+
+    render = lambda: pdf_reports_final.generate_vehicle_report_from_query(
+        conn, query, (args.title,), args.title, report_type
+    )
+    if args.no_cache:
+        pdf_bytes = render()
+    else:
+        pdf_bytes = report_cache.ReportCache().get_or_render(
+            report_type, args.title, db.data_token(conn), pdf_reports_final.TEMPLATE_VERSION, render
+        )
+    output = args.output or pdf_reports_final.report_filename(report_type)
+    with open(output, 'wb') as f:
+        f.write(pdf_bytes)
+    print(f"Wrote {output}")
+
+def cmd_export(conn, args):
+    rows = snapshot.export_snapshot(conn, args.file, row_group_size=args.row_group_size)
+    print(f"Exported {rows} vehicles to {args.file}")
+
+def cmd_stats(conn, args):
+    if args.check:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            mismatches = db.check_stats(conn)
+            if mismatches:
+                db.rebuild_stats(conn)
+                db.bump_data_version(conn)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        for dimension, value, stored, actual in mismatches:
+            print(f"rebuilt {dimension} {value or '(none)'}: {stored} -> {actual}", file=sys.stderr)
+        print(f"{len(mismatches)} counters were out of date", file=sys.stderr)
+
+    print(f"Total vehicles: {db.total_vehicles(conn)}")
+    for label, dimension in (("By vehicle type", "VEHICLE_TYPE"), ("By usage", "USED_FOR"), ("By owner", "OWNER")):
+        print(f"\n{label}:")
+        for value, count in db.vehicle_stats(conn, dimension):
+            print(f"  {value or '(none)':<40} {count:>8}")
+
+def cmd_reset(conn, args):
+    if not args.yes:
+        raise ValueError("Refusing to delete every vehicle without --yes")
+    db.reset_database(conn)
+    print("Database has been reset")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='vms', description="Vehicle Management System command line")
+    parser.add_argument('--db', default=db.DB_PATH, help="SQLite database (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('import', help="Import vehicles from a CSV, Excel or Parquet snapshot file")
+    p.add_argument('file')
+    p.add_argument('--policy', default='skip', choices=list(importer.CONFLICT_POLICIES),
+                   help="What to do with existing VEH_IDs (default: %(default)s)")
+    p.add_argument('--chunk-size', type=int, default=importer.DEFAULT_CHUNK_SIZE)
+    p.add_argument('--rejects', help="Write rejected rows to this CSV file")
+    p.add_argument('--remove-missing', action='store_true',
+                   help="With --policy sync, delete vehicles missing from the file")
+    p.add_argument('--quiet', action='store_true')
+    p.set_defaults(handler=cmd_import)
+
+    p = commands.add_parser('export', help="Export the vehicles table to a Parquet snapshot")
+    p.add_argument('file')
+    p.add_argument('--row-group-size', type=int, default=snapshot.DEFAULT_ROW_GROUP_SIZE)
+    p.set_defaults(handler=cmd_export)
+
+    p = commands.add_parser('generate', help="Generate vehicles with sequential VEH_IDs")
+    p.add_argument('counts', nargs='+', metavar='TYPE=COUNT')
+    p.set_defaults(handler=cmd_generate)
+
+    p = commands.add_parser('report', help="Render a PDF report, or every report into a ZIP")
+    p.add_argument('kind', choices=['vehicle-type', 'usage', 'all'])
+    p.add_argument('title', nargs='?', help="Vehicle type or usage category")
+    p.add_argument('-o', '--output')
+    p.add_argument('--workers', type=int, help="Worker processes for 'all' (default: all cores)")
+    p.add_argument('--no-cache', action='store_true', help="Always render, bypassing the report cache")
+    p.set_defaults(handler=cmd_report)
+
+    p = commands.add_parser('stats', help="Print vehicle counts")
+    p.add_argument('--check', action='store_true',
+                   help="Verify the counters against the vehicles table and rebuild them if needed")
+    p.set_defaults(handler=cmd_stats)
+
+    p = commands.add_parser('reset', help="Delete every vehicle")
+    p.add_argument('--yes', action='store_true')
+    p.set_defaults(handler=cmd_reset)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'report' and args.kind != 'all' and not args.title:
+        parser.error(f"report {args.kind} needs a title")
+
+    pool = db.ConnectionPool(args.db, size=1)
+    try:
+        with pool.connection() as conn:
+            db.init_schema(conn)
+            args.handler(conn, args)
+    except ValueError as e:
+        print(f"vms: error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        pool.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
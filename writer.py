@@ -0,0 +1,118 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import db
+import perf
+
+# Most writes committed together
+MAX_BATCH = 64
+
+# Seconds to hold a batch open for more writes after the first arrives.
+# With 0 a batch is whatever queued up while the previous one was being
+# written: no added latency when idle, large batches when busy.
+MAX_DELAY = 0
+
+class BatchWriter:
+    """
+    One thread that applies small writes from every session in shared transactions
+
+    Under SQLite's single-writer model each commit is a lock handoff and a
+    WAL append of its own. submit() queues a write and returns a Future;
+    the writer thread takes everything queued (up to MAX_BATCH writes,
+    optionally waiting MAX_DELAY for more) and runs it in one
+    ConnectionPool.write transaction, so a burst of edits costs one
+    commit instead of one each.
+
+    Each write runs inside its own savepoint: if it raises, only its own
+    changes are rolled back and its Future gets the exception, while the
+    rest of the batch commits. Results are handed out only after the
+    commit, so a Future that resolves is a write that is on disk. If the
+    commit itself fails, every Future in the batch gets that error.
+
+    Meant for short writes like form saves and single deletes; a long
+    write (generation, imports) would hold up everything queued behind it.
+    """
+    def __init__(self, pool, max_batch=MAX_BATCH, max_delay=MAX_DELAY):
+        self.pool = pool
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name='vms-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, func, *args, **kwargs):
+        """Queue func(conn, *args, **kwargs); the returned Future holds its result"""
+        future = Future()
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def write(self, func, *args, **kwargs):
+        """submit() and wait for the result, raising what func raised"""
+        return self.submit(func, *args, **kwargs).result()
+
+    def _next_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Write what was collected, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            batch = [item for item in batch if item[0].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                with perf.timed("writer: batch", rows=len(batch)):
+                    outcomes = self.pool.write(_apply, batch)
+            except Exception as e:
+                for future, *_ in batch:
+                    future.set_exception(e)
+                continue
+            for (future, *_), (ok, value) in zip(batch, outcomes):
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def shutdown(self, wait=True):
+        """Stop after the writes already queued"""
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+def _apply(conn, batch):
+    # Runs again from the start if ConnectionPool.write retries the batch
+    outcomes = []
+    for _, func, args, kwargs in batch:
+        conn.execute("SAVEPOINT batch_write")
+        try:
+            result = func(conn, *args, **kwargs)
+        except Exception as e:
+            conn.execute("ROLLBACK TO batch_write")
+            conn.execute("RELEASE batch_write")
+            if db.is_locked_error(e):
+                # Let ConnectionPool.write retry the whole batch
+                raise
+            outcomes.append((False, e))
+        else:
+            conn.execute("RELEASE batch_write")
+            outcomes.append((True, result))
+    return outcomes